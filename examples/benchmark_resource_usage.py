@@ -0,0 +1,52 @@
+"""
+Measure the per-test overhead of --discord-resource-usage by driving the hook wrapper directly.
+
+Usage:
+    python examples/benchmark_resource_usage.py [number of tests]
+"""
+
+import sys
+import time
+from types import SimpleNamespace
+
+from pytest_discord._resource import ResourceSampler
+
+
+def run(sampler: ResourceSampler, items: list) -> float:
+    start = time.perf_counter()
+
+    for item in items:
+        wrapper = sampler.pytest_runtest_protocol(item)
+        next(wrapper)
+        next(wrapper, None)
+
+    return time.perf_counter() - start
+
+
+def run_baseline(items: list) -> float:
+    def protocol(item):
+        yield
+
+    start = time.perf_counter()
+
+    for item in items:
+        wrapper = protocol(item)
+        next(wrapper)
+        next(wrapper, None)
+
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    items = [SimpleNamespace(nodeid=f"test_module.py::test_{i}") for i in range(count)]
+
+    sampler = ResourceSampler()
+    elapsed = run(sampler, items) - run_baseline(items)
+    sampler.pytest_unconfigure()
+
+    print(f"{count} tests: {elapsed * 1e6 / count:.2f} us overhead per test")
+
+
+if __name__ == "__main__":
+    main()
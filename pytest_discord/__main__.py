@@ -0,0 +1,142 @@
+import argparse
+import asyncio
+import os
+import sys
+from typing import List, Optional
+
+from ._checkpoint import load_checkpoint, make_checkpoint_message
+from ._const import Default, Option
+from ._digest import DigestStore, make_digest_message
+from .plugin import MAX_EMBED_LEN, _send_message
+
+
+def _add_webhook_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--webhook",
+        metavar="WEBHOOK_URL",
+        default=os.environ.get(Option.DISCORD_WEBHOOK.envvar_str),
+        help=Option.DISCORD_WEBHOOK.help_msg
+        + f" defaults to {Option.DISCORD_WEBHOOK.envvar_str} environment variable.",
+    )
+    parser.add_argument(
+        "--username",
+        default=os.environ.get(Option.DISCORD_USERNAME.envvar_str) or Default.USERNAME,
+        help=Option.DISCORD_USERNAME.help_msg,
+    )
+
+
+def parse_option(args: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="pytest-discord")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    digest_parser = subparsers.add_parser(
+        "digest", help="post a digest of results accumulated by --discord-digest."
+    )
+    digest_parser.add_argument(
+        "digest_dir",
+        metavar="DIR",
+        nargs="?",
+        default=os.environ.get(Option.DISCORD_DIGEST.envvar_str),
+        help="directory specified to --discord-digest.",
+    )
+    _add_webhook_options(digest_parser)
+
+    flush_parser = subparsers.add_parser(
+        "flush", help="post partial results of a checkpoint file written by --discord-checkpoint."
+    )
+    flush_parser.add_argument(
+        "checkpoint_path",
+        metavar="PATH",
+        nargs="?",
+        default=os.environ.get(Option.DISCORD_CHECKPOINT.envvar_str),
+        help="path specified to --discord-checkpoint.",
+    )
+    _add_webhook_options(flush_parser)
+
+    return parser.parse_args(args)
+
+
+def digest(options: argparse.Namespace) -> int:
+    if not options.digest_dir:
+        print("pytest-discord error: require a digest directory", file=sys.stderr)
+        return 1
+
+    if not options.webhook:
+        print("pytest-discord error: require a webhook url", file=sys.stderr)
+        return 1
+
+    store = DigestStore(options.digest_dir)
+
+    with store.lock():
+        digest = store.make_digest()
+        if not digest.runs:
+            print("pytest-discord: no results to digest")
+            return 0
+
+        header, embed = make_digest_message(digest, max_len=MAX_EMBED_LEN)
+        is_sent = asyncio.run(
+            _send_message(
+                write_line=print,
+                url=options.webhook,
+                header=header,
+                username=options.username,
+                avatar_url=None,
+                embeds=[embed],
+            )
+        )
+        if not is_sent:
+            return 1
+
+        store.rotate(digest)
+
+    return 0
+
+
+def flush(options: argparse.Namespace) -> int:
+    if not options.checkpoint_path:
+        print("pytest-discord error: require a checkpoint path", file=sys.stderr)
+        return 1
+
+    if not options.webhook:
+        print("pytest-discord error: require a webhook url", file=sys.stderr)
+        return 1
+
+    try:
+        checkpoint = load_checkpoint(options.checkpoint_path)
+    except FileNotFoundError:
+        print("pytest-discord: no checkpoint to flush")
+        return 0
+
+    header, embed = make_checkpoint_message(checkpoint, max_len=MAX_EMBED_LEN)
+    is_sent = asyncio.run(
+        _send_message(
+            write_line=print,
+            url=options.webhook,
+            header=header,
+            username=options.username,
+            avatar_url=None,
+            embeds=[embed],
+        )
+    )
+    if not is_sent:
+        return 1
+
+    os.remove(options.checkpoint_path)
+
+    return 0
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    options = parse_option(args)
+
+    if options.command == "digest":
+        return digest(options)
+
+    if options.command == "flush":
+        return flush(options)
+
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+import gzip
+import io
+import re
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from _pytest.reports import BaseReport
+
+
+MAX_ATTACHMENT_CT = 10
+MAX_ATTACHMENTS_SIZE = 10 * 1024 * 1024
+COMPRESS_THRESHOLD = 1024 * 1024
+
+_COMPRESSED_EXTENSIONS = (".gz", ".zip")
+_re_unsafe_filename_char = re.compile(r"[^\w\-.]+")
+
+
+class Attachment(NamedTuple):
+    filename: str
+    data: bytes
+
+
+def compress_attachment(attachment: Attachment, threshold: int) -> Attachment:
+    if len(attachment.data) <= threshold or attachment.filename.endswith(_COMPRESSED_EXTENSIONS):
+        return attachment
+
+    # a fixed mtime keeps the compressed bytes reproducible, e.g. for dedup keys
+    return Attachment(f"{attachment.filename}.gz", gzip.compress(attachment.data, mtime=0))
+
+
+def pack_attachments(
+    attachments: Iterable[Attachment],
+    max_ct: int = MAX_ATTACHMENT_CT,
+    max_size: int = MAX_ATTACHMENTS_SIZE,
+) -> Tuple[List[Attachment], List[Attachment]]:
+    """
+    Pack attachments into a message in the order of priority.
+
+    Returns:
+        A tuple of attachments packed into a message and attachments that exceed the limits.
+    """
+
+    packed: List[Attachment] = []
+    dropped: List[Attachment] = []
+    total_size = 0
+
+    for attachment in attachments:
+        size = len(attachment.data)
+
+        if len(packed) >= max_ct or total_size + size > max_size:
+            dropped.append(attachment)
+            continue
+
+        packed.append(attachment)
+        total_size += size
+
+    return (packed, dropped)
+
+
+def make_junitxml_attachment(xml_path: str, filename: str) -> Attachment:
+    with open(xml_path, "rb") as f:
+        return Attachment(filename, f.read())
+
+
+def make_logs_attachment(reports: Sequence[BaseReport], filename: str) -> Optional[Attachment]:
+    """
+    Make a zip archive that includes a log file per failure:
+    a traceback and captured outputs of a test.
+    """
+
+    if not reports:
+        return None
+
+    buf = io.BytesIO()
+
+    with zipfile.ZipFile(buf, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for i, report in enumerate(reports):
+            chunks = [f"# {report.nodeid}", report.longreprtext]
+            for title, content in report.sections:
+                chunks.append(f"# {title}\n{content}")
+
+            archive.writestr(
+                "{:03d}_{}.log".format(i + 1, _re_unsafe_filename_char.sub("_", report.nodeid)),
+                "\n\n".join(chunks),
+            )
+
+    return Attachment(filename, buf.getvalue())
+
+
+class AttachmentBuilder:
+    """
+    Generate attachments in parallel on a thread pool.
+    Attachments that exceed ``compress_threshold`` bytes are gzip-compressed.
+    Generated attachments are ordered by the priority, lower first.
+    An attachment that failed to be generated by ``OSError`` is skipped and recorded to ``errors``.
+    """
+
+    def __init__(self, compress_threshold: int = COMPRESS_THRESHOLD, max_workers: int = 4) -> None:
+        self.__compress_threshold = compress_threshold
+        self.__executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="pytest-discord-attachment"
+        )
+        self.__futures: List[Tuple[int, "Future[Optional[Attachment]]"]] = []
+        self.__errors: List[OSError] = []
+
+    @property
+    def errors(self) -> List[OSError]:
+        return self.__errors
+
+    def submit(
+        self, make_attachment: Callable[[], Optional[Attachment]], priority: int = 0
+    ) -> "Future[Optional[Attachment]]":
+        future = self.__executor.submit(self.__build, make_attachment)
+        self.__futures.append((priority, future))
+
+        return future
+
+    def results(self) -> List[Attachment]:
+        """
+        Wait for generating attachments and return them in the order of the priority.
+        """
+
+        try:
+            attachments = [
+                future.result() for _, future in sorted(self.__futures, key=lambda item: item[0])
+            ]
+        finally:
+            self.__executor.shutdown(wait=False)
+
+        return [attachment for attachment in attachments if attachment is not None]
+
+    def __build(self, make_attachment: Callable[[], Optional[Attachment]]) -> Optional[Attachment]:
+        try:
+            attachment = make_attachment()
+        except OSError as e:
+            self.__errors.append(e)
+            return None
+
+        if attachment is None:
+            return None
+
+        return compress_attachment(attachment, self.__compress_threshold)
@@ -0,0 +1,281 @@
+import math
+import mmap
+import os
+import struct
+from array import array
+from hashlib import blake2b
+from itertools import compress
+from typing import AbstractSet, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+from _pytest.reports import TestReport
+
+
+EWMA_ALPHA = 0.2
+MIN_SAMPLES = 5
+STDDEV_THRESHOLD = 3.0
+RATIO_THRESHOLD = 1.5
+MIN_REGRESSION_SECONDS = 0.1
+
+_MAGIC = b"PDDB"
+_VERSION = 2
+_HEADER = struct.Struct("<4sII4x")  # padded to keep the following columns 8-byte aligned
+
+
+class DurationRegression(NamedTuple):
+    nodeid: str
+    duration: float
+    mean: float
+    stddev: float
+
+
+class DurationEstimate(NamedTuple):
+    seconds: float
+    known: int
+    unknown: int
+
+
+def _hash_nodeid(nodeid: str) -> int:
+    return int.from_bytes(blake2b(nodeid.encode("utf8"), digest_size=8).digest(), "little")
+
+
+class DurationBaseline:
+    """
+    Rolling per-test duration baselines: exponentially weighted mean and variance.
+
+    The on-disk table is a header followed by columns of 64-bit hashes of node IDs (uint64),
+    means (float64), variances (float64), sample counts (uint32), and newline-separated node IDs.
+    Baselines are looked up by the hash column, so loading a table copies the columns
+    without creating an object per test or decoding the node IDs.
+    """
+
+    @property
+    def nodeids(self) -> List[str]:
+        keys = self.__keys.decode("utf8").split("\n") if self.__keys else []
+        return keys + self.__added_nodeids
+
+    @property
+    def means(self) -> "array[float]":
+        return self.__means
+
+    def __init__(
+        self,
+        hashes: Optional["array[int]"] = None,
+        means: Optional["array[float]"] = None,
+        variances: Optional["array[float]"] = None,
+        counts: Optional["array[int]"] = None,
+        keys: bytes = b"",
+    ) -> None:
+        self.__hashes = hashes or array("Q")
+        self.__means = means or array("d")
+        self.__variances = variances or array("d")
+        self.__counts = counts or array("I")
+        self.__keys = keys
+
+        # hash to the position in the columns, built on the first update
+        self.__index: Optional[Dict[int, int]] = None
+        self.__added_nodeids: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.__means)
+
+    @classmethod
+    def load(cls, path: str) -> "DurationBaseline":
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return cls()
+
+        try:
+            return cls(*_unpack(memoryview(data)))
+        except (ValueError, struct.error):
+            return cls()
+
+    def save(self, path: str) -> None:
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+
+        keys = self.__keys
+        if self.__added_nodeids:
+            added_keys = "\n".join(self.__added_nodeids).encode("utf8")
+            keys = keys + b"\n" + added_keys if keys else added_keys
+            self.__keys = keys
+            self.__added_nodeids = []
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, len(self.__hashes)))
+            f.write(self.__hashes.tobytes())
+            f.write(self.__means.tobytes())
+            f.write(self.__variances.tobytes())
+            f.write(self.__counts.tobytes())
+            f.write(keys)
+
+        os.replace(tmp_path, path)
+
+    def update(
+        self, durations: Mapping[str, float], keys: Optional[Mapping[str, int]] = None
+    ) -> List[DurationRegression]:
+        """
+        Compare durations of a session with the baselines, then update the baselines
+        with the durations in a single pass.
+        ``keys`` are hashes of the node IDs computed in advance, if any.
+
+        Returns:
+            Tests that are significantly slower than their baselines, the largest slowdown first.
+        """
+
+        index = self.__get_index()
+        hashes = self.__hashes
+        means = self.__means
+        variances = self.__variances
+        counts = self.__counts
+        regressions = []
+
+        hashed = list(map(keys.__getitem__ if keys is not None else _hash_nodeid, durations))
+        positions = list(map(index.get, hashed))
+
+        for (nodeid, duration), key, i in zip(durations.items(), hashed, positions):
+            if i is None:
+                index[key] = len(means)
+                self.__added_nodeids.append(nodeid)
+                hashes.append(key)
+                means.append(duration)
+                variances.append(0.0)
+                counts.append(1)
+                continue
+
+            mean = means[i]
+            variance = variances[i]
+            diff = duration - mean
+
+            if (
+                counts[i] >= MIN_SAMPLES
+                and diff > MIN_REGRESSION_SECONDS
+                and duration > mean * RATIO_THRESHOLD
+                and diff * diff > STDDEV_THRESHOLD * STDDEV_THRESHOLD * variance
+            ):
+                regressions.append(DurationRegression(nodeid, duration, mean, math.sqrt(variance)))
+
+            means[i] = mean + EWMA_ALPHA * diff
+            variances[i] = (1 - EWMA_ALPHA) * (variance + EWMA_ALPHA * diff * diff)
+            if counts[i] < 0xFFFFFFFF:
+                counts[i] += 1
+
+        regressions.sort(key=lambda regression: regression.duration - regression.mean, reverse=True)
+
+        return regressions
+
+    def __get_index(self) -> Dict[int, int]:
+        # built from the hash column in a single C-level pass only when the baselines are updated
+        if self.__index is None:
+            self.__index = dict(zip(self.__hashes, range(len(self.__hashes))))
+
+        return self.__index
+
+
+def _check_header(data: Union[memoryview, mmap.mmap]) -> int:
+    magic, version, count = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("unsupported duration baseline format")
+
+    if len(data) < _HEADER.size + (8 + 8 + 8 + 4) * count:
+        raise ValueError("truncated duration baseline")
+
+    return count
+
+
+def _unpack(data: memoryview) -> tuple:
+    count = _check_header(data)
+
+    offset = _HEADER.size
+    columns = []
+    for typecode in ["Q", "d", "d", "I"]:
+        values = array(typecode)
+        size = values.itemsize * count
+        values.frombytes(data[offset : offset + size])
+        columns.append(values)
+        offset += size
+
+    keys = bytes(data[offset:])
+    if keys.count(b"\n") != max(count - 1, 0):
+        raise ValueError("corrupted duration baseline")
+
+    return (*columns, keys)
+
+
+def estimate_duration(path: str, nodeids: AbstractSet[str]) -> Optional[DurationEstimate]:
+    """
+    Estimate the total duration of tests from a duration baseline table.
+    The table is memory-mapped, and the hashes of the node IDs are matched against
+    the mapped hash column, without reading the node IDs of the table.
+    Tests without baselines are estimated by the mean of all baselines.
+
+    Returns:
+        None if the table has no baselines.
+    """
+
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            known_seconds, known, total_seconds, count = _scan_means(data, nodeids)
+    except (OSError, ValueError, struct.error):
+        return None
+
+    if not count:
+        return None
+
+    unknown = len(nodeids) - known
+
+    return DurationEstimate(known_seconds + unknown * total_seconds / count, known, unknown)
+
+
+def _scan_means(data: mmap.mmap, nodeids: AbstractSet[str]) -> Tuple[float, int, float, int]:
+    count = _check_header(data)
+    hashes_offset = _HEADER.size
+    means_offset = hashes_offset + 8 * count
+
+    keys = set(map(_hash_nodeid, nodeids))
+
+    # the views must be released before the mmap is closed
+    with memoryview(data) as view:
+        with view[hashes_offset:means_offset].cast("Q") as hashes:
+            # loop in C over the mapped column
+            is_known = list(map(keys.__contains__, hashes))
+
+        with view[means_offset : means_offset + 8 * count].cast("d") as means:
+            return (sum(compress(means, is_known)), sum(is_known), sum(means), count)
+
+
+class DurationRecorder:
+    """
+    Record durations of passed tests and update the duration baseline at the session end.
+    """
+
+    @property
+    def regressions(self) -> List[DurationRegression]:
+        return self.__regressions
+
+    def __init__(self, baseline_path: str) -> None:
+        self.__baseline_path = baseline_path
+        self.__durations: Dict[str, float] = {}
+        self.__keys: Dict[str, int] = {}
+        self.__regressions: List[DurationRegression] = []
+
+    def pytest_runtest_logreport(self, report: TestReport) -> None:
+        if report.when == "call" and report.passed:
+            self.__durations[report.nodeid] = report.duration
+
+            # hash as tests finish so that the session end does not pay for it
+            if report.nodeid not in self.__keys:
+                self.__keys[report.nodeid] = _hash_nodeid(report.nodeid)
+
+    def pytest_sessionfinish(self) -> None:
+        if not self.__durations:
+            return
+
+        baseline = DurationBaseline.load(self.__baseline_path)
+        self.__regressions = baseline.update(self.__durations, self.__keys)
+        baseline.save(self.__baseline_path)
+        self.__durations = {}
+        self.__keys = {}
@@ -0,0 +1,73 @@
+import json
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from ._webhook import Colour, Embed
+
+
+CHECKPOINT_FSYNC_INTERVAL = 1.0
+MAX_CHECKPOINT_FAILURES = 10
+
+
+class Checkpoint(NamedTuple):
+    stat_count_map: Dict[str, int]
+    failures: List[Tuple[str, Optional[str]]]
+    is_finished: bool
+
+
+def load_checkpoint(path: str) -> Checkpoint:
+    """
+    Load test records of a checkpoint file written by ``NdjsonExporter``.
+    A truncated last line, which is left by a killed process, is ignored.
+    """
+
+    stat_count_map: Dict[str, int] = defaultdict(int)
+    failures = []
+    is_finished = False
+
+    with open(path, encoding="utf8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+
+            if record.get("type") == "summary":
+                is_finished = True
+                continue
+
+            outcome = record.get("outcome")
+            stat_count_map[outcome] += 1
+
+            if outcome in ("failed", "error"):
+                failures.append((record["nodeid"], record.get("signature")))
+
+    return Checkpoint(
+        stat_count_map=dict(stat_count_map), failures=failures, is_finished=is_finished
+    )
+
+
+def make_checkpoint_message(checkpoint: Checkpoint, max_len: int) -> Tuple[str, Embed]:
+    header = "[partial] test summary info: {} tests recovered from a checkpoint".format(
+        sum(checkpoint.stat_count_map.values())
+    )
+
+    lines = [
+        ", ".join(f"{ct} {outcome}" for outcome, ct in checkpoint.stat_count_map.items() if ct)
+        or "no tests finished",
+        "the session finished before the notification"
+        if checkpoint.is_finished
+        else "the session terminated before finishing",
+    ]
+
+    if checkpoint.failures:
+        lines.append("")
+        for nodeid, signature in checkpoint.failures[:MAX_CHECKPOINT_FAILURES]:
+            lines.append(f"`{nodeid}`: {signature}" if signature else f"`{nodeid}`")
+
+        if len(checkpoint.failures) > MAX_CHECKPOINT_FAILURES:
+            lines.append(f"and other {len(checkpoint.failures) - MAX_CHECKPOINT_FAILURES} failed")
+
+    colour = Colour.RED if checkpoint.failures else Colour.GOLD
+
+    return (header, Embed(description="\n".join(lines)[:max_len], colour=colour))
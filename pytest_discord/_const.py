@@ -1,4 +1,4 @@
-from enum import Enum, auto, unique
+from enum import Enum, IntEnum, auto, unique
 from textwrap import dedent
 
 from pathvalidate import replace_symbol
@@ -8,6 +8,8 @@ from pytest_md_report import ColorPolicy
 class Default:
     COLOR = ColorPolicy.AUTO
     USERNAME = "pytest"
+    DEDUP_TTL = 24 * 60 * 60
+    DIGEST_WINDOW = 60 * 60
 
 
 @unique
@@ -17,6 +19,33 @@ class TestResultType(Enum):
     FAIL = auto()
 
 
+@unique
+class AttachmentPriority(IntEnum):
+    MARKDOWN = auto()
+    JUNITXML = auto()
+    LOGS = auto()
+    EXPORT = auto()
+
+
+@unique
+class WebhookBackend(Enum):
+    BUILTIN = "builtin"
+    DISCORD_PY = "discord.py"
+
+
+@unique
+class DedupMode(Enum):
+    SKIP = "skip"
+    REFERENCE = "reference"
+
+
+@unique
+class NotifyStatus(Enum):
+    UNSENT = auto()  # results remain in a checkpoint for 'pytest-discord flush'
+    DELIVERED = auto()
+    SUPPRESSED = auto()  # deliberately not sent: deduplicated, unchanged, or a dry run
+
+
 @unique
 class Option(Enum):
     DISCORD_WEBHOOK = (
@@ -47,6 +76,133 @@ class Option(Enum):
         "discord-attach-file",
         "post pytest results as a markdown file to a discord channel.",
     )
+    DISCORD_ATTACH_JUNITXML = (
+        "discord-attach-junitxml",
+        "attach a JUnit XML file to a discord message. requires --junitxml.",
+    )
+    DISCORD_ATTACH_LOGS = (
+        "discord-attach-logs",
+        "attach tracebacks and captured outputs of failed tests as a zip file.",
+    )
+    DISCORD_BACKEND = (
+        "discord-backend",
+        dedent(
+            """\
+            webhook client to send messages.
+            builtin: a lightweight client built on aiohttp.
+            discord.py: discord.py package (requires discord.py to be installed).
+            defaults to builtin.
+            """
+        ),
+    )
+    DISCORD_DURATION_REGRESSION = (
+        "discord-duration-regression",
+        dedent(
+            """\
+            report tests that are significantly slower than their duration baselines.
+            baselines are stored in the pytest cache directory.
+            """
+        ),
+    )
+    DISCORD_RESOURCE_USAGE = (
+        "discord-resource-usage",
+        "report tests that consume the most CPU time and RSS.",
+    )
+    DISCORD_EXPORT = (
+        "discord-export",
+        "path to write test results as NDJSON (newline delimited JSON).",
+    )
+    DISCORD_ATTACH_EXPORT = (
+        "discord-attach-export",
+        "attach a gzip-compressed NDJSON export to a discord message. requires --discord-export.",
+    )
+    DISCORD_DEDUP = (
+        "discord-dedup",
+        dedent(
+            """\
+            deduplicate a notification identical to a previous run.
+            skip: do not send the notification.
+            reference: send a short reference to the previous notification.
+            """
+        ),
+    )
+    DISCORD_DEDUP_DIR = (
+        "discord-dedup-dir",
+        "directory to store deduplication keys. defaults to the pytest cache directory.",
+    )
+    DISCORD_DEDUP_TTL = (
+        "discord-dedup-ttl",
+        f"seconds to keep deduplication keys. defaults to {Default.DEDUP_TTL}.",
+    )
+    DISCORD_DIGEST = (
+        "discord-digest",
+        dedent(
+            """\
+            directory to store results for digest mode.
+            if set, results of runs are accumulated and posted as a digest
+            once per --discord-digest-window.
+            """
+        ),
+    )
+    DISCORD_DIGEST_WINDOW = (
+        "discord-digest-window",
+        f"seconds of a digest window. defaults to {Default.DIGEST_WINDOW}.",
+    )
+    DISCORD_CHECKPOINT = (
+        "discord-checkpoint",
+        dedent(
+            """\
+            path to a checkpoint file of test results.
+            results of a process that died before the notification can be posted by
+            'pytest-discord flush' command.
+            """
+        ),
+    )
+    DISCORD_OWNERS_FILE = (
+        "discord-owners-file",
+        dedent(
+            """\
+            path to a CODEOWNERS-style file that maps test path patterns to owners.
+            failures are also posted to webhooks of their owners.
+            """
+        ),
+    )
+    DISCORD_OWNER_WEBHOOK = (
+        "discord-owner-webhook",
+        dedent(
+            """\
+            webhook of an owner in '<owner> <webhook url> [<mention>]' format.
+            can be specified multiple times.
+            """
+        ),
+    )
+    DISCORD_PERSISTENT = (
+        "discord-persistent",
+        dedent(
+            """\
+            keep an event loop and a connection pool across pytest sessions in a process,
+            and send a message only when the outcome changes from the previous session.
+            """
+        ),
+    )
+    DISCORD_DRY_RUN = (
+        "discord-dry-run",
+        dedent(
+            """\
+            directory to write a webhook payload and attachments instead of sending them.
+            a webhook url is not required.
+            """
+        ),
+    )
+    DISCORD_NOTIFY_START = (
+        "discord-notify-start",
+        dedent(
+            """\
+            send a message with the number of collected tests and an estimated finish time
+            when a session starts. the estimate is based on the duration baselines.
+            """
+        ),
+    )
 
     @property
     def cmdoption_str(self) -> str:
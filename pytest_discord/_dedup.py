@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import time
+from typing import Iterable, Mapping, Optional, Tuple
+
+
+def make_dedup_key(
+    webhook_url: str,
+    stat_count_map: Mapping[str, int],
+    failure_signatures: Iterable[Tuple[str, Optional[str]]],
+    attachments: Iterable[bytes] = (),
+) -> str:
+    """
+    Make a key of a notification from normalized contents: outcome counts,
+    failure signatures, and digests of attachments.
+    The key also covers the webhook URL, so suites posting to different webhooks
+    do not suppress each other when they share a directory of keys.
+    """
+
+    hasher = hashlib.sha256()
+    hasher.update(
+        json.dumps(
+            {
+                "webhook": webhook_url,
+                "outcomes": {name: count for name, count in stat_count_map.items() if count},
+                "failures": sorted((nodeid, sig or "") for nodeid, sig in failure_signatures),
+            },
+            sort_keys=True,
+        ).encode("utf8")
+    )
+
+    for data in attachments:
+        hasher.update(hashlib.sha256(data).hexdigest().encode("ascii"))
+
+    return hasher.hexdigest()
+
+
+class DedupCache:
+    """
+    A directory of posted notification keys that expire after ``ttl`` seconds.
+    The directory can be shared among multiple hosts.
+    """
+
+    def __init__(self, cache_dir: str, ttl: float) -> None:
+        self.__cache_dir = cache_dir
+        self.__ttl = ttl
+
+    def lookup(self, key: str) -> Optional[float]:
+        """
+        Return the time when a notification of ``key`` was posted,
+        or ``None`` if no unexpired entry is found.
+        """
+
+        now = time.time()
+        self.evict(now)
+
+        try:
+            with open(self.__to_path(key), encoding="utf8") as f:
+                posted_at = json.load(f)["posted_at"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        if now - posted_at > self.__ttl:
+            return None
+
+        return posted_at
+
+    def store(self, key: str) -> None:
+        os.makedirs(self.__cache_dir, exist_ok=True)
+
+        path = self.__to_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf8") as f:
+            json.dump({"posted_at": time.time()}, f)
+
+        os.replace(tmp_path, path)
+
+    def evict(self, now: Optional[float] = None) -> None:
+        if now is None:
+            now = time.time()
+
+        try:
+            entries = list(os.scandir(self.__cache_dir))
+        except OSError:
+            return
+
+        for entry in entries:
+            if not entry.name.endswith(".json"):
+                continue
+
+            try:
+                if now - entry.stat().st_mtime > self.__ttl:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    def __to_path(self, key: str) -> str:
+        return os.path.join(self.__cache_dir, f"{key}.json")
@@ -0,0 +1,248 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+from ._webhook import Colour, Embed
+
+
+MAX_DIGEST_TESTS = 10
+
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _lock_file(fd: int) -> None:
+        while True:
+            try:
+                # retries for 10 seconds before raising OSError
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+    def _unlock_file(fd: int) -> None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock_file(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _unlock_file(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class Digest(NamedTuple):
+    window_start: float
+    window_end: float
+    runs: int
+    failed_runs: int
+    outcomes: Dict[str, int]
+    failures: Dict[str, int]
+    new_failures: List[str]
+    prev_run_pass_rate: Optional[float]
+
+    @property
+    def run_pass_rate(self) -> float:
+        if not self.runs:
+            return 0.0
+
+        return (self.runs - self.failed_runs) / self.runs * 100
+
+
+class DigestStore:
+    """
+    Accumulate results of runs into an aggregate of the current digest window.
+    Each run updates the aggregate in place, so making a digest does not depend on
+    the number of stored runs.
+
+    Reads and writes of the aggregate are serialized by a lock file, since runs may overlap.
+    Hold ``lock()`` across a sequence of calls that must be atomic, such as making a digest
+    and rotating the window.
+    """
+
+    STATE_FILENAME = "digest.json"
+    LOCK_FILENAME = "digest.lock"
+
+    def __init__(self, store_dir: str) -> None:
+        self.__store_dir = store_dir
+        self.__state_path = os.path.join(store_dir, self.STATE_FILENAME)
+        self.__lock_path = os.path.join(store_dir, self.LOCK_FILENAME)
+        self.__thread_lock = threading.RLock()
+        self.__lock_fd: Optional[int] = None
+        self.__lock_depth = 0
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """
+        Lock the store exclusively among processes. The lock is reentrant within an instance.
+        """
+
+        with self.__thread_lock:
+            if self.__lock_depth == 0:
+                os.makedirs(self.__store_dir, exist_ok=True)
+                fd = os.open(self.__lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    _lock_file(fd)
+                except BaseException:
+                    os.close(fd)
+                    raise
+
+                self.__lock_fd = fd
+
+            self.__lock_depth += 1
+            try:
+                yield
+            finally:
+                self.__lock_depth -= 1
+                if self.__lock_depth == 0 and self.__lock_fd is not None:
+                    _unlock_file(self.__lock_fd)
+                    os.close(self.__lock_fd)
+                    self.__lock_fd = None
+
+    def append(
+        self,
+        stat_count_map: Mapping[str, int],
+        failed_nodeids: Iterable[str],
+        now: Optional[float] = None,
+    ) -> None:
+        if now is None:
+            now = time.time()
+
+        failed_nodeids = list(failed_nodeids)
+
+        with self.lock():
+            state = self.__load_state(now)
+
+            state["runs"] += 1
+            if failed_nodeids:
+                state["failed_runs"] += 1
+
+            outcomes = state["outcomes"]
+            for name, count in stat_count_map.items():
+                outcomes[name] = outcomes.get(name, 0) + count
+
+            failures = state["failures"]
+            for nodeid in failed_nodeids:
+                failures[nodeid] = failures.get(nodeid, 0) + 1
+
+            self.__save_state(state)
+
+    def is_window_expired(self, window: float, now: Optional[float] = None) -> bool:
+        if now is None:
+            now = time.time()
+
+        with self.lock():
+            state = self.__load_state(now)
+
+        return state["runs"] > 0 and now - state["window_start"] >= window
+
+    def make_digest(self, now: Optional[float] = None) -> Digest:
+        if now is None:
+            now = time.time()
+
+        with self.lock():
+            state = self.__load_state(now)
+
+        prev_failures = set(state["prev_failures"])
+
+        return Digest(
+            window_start=state["window_start"],
+            window_end=now,
+            runs=state["runs"],
+            failed_runs=state["failed_runs"],
+            outcomes=state["outcomes"],
+            failures=state["failures"],
+            new_failures=sorted(set(state["failures"]) - prev_failures),
+            prev_run_pass_rate=state["prev_run_pass_rate"],
+        )
+
+    def rotate(self, digest: Digest) -> None:
+        state = self.__make_empty_state(digest.window_end)
+        state["prev_failures"] = sorted(digest.failures)
+        state["prev_run_pass_rate"] = digest.run_pass_rate
+
+        with self.lock():
+            self.__save_state(state)
+
+    @staticmethod
+    def __make_empty_state(window_start: float) -> Dict[str, Any]:
+        return {
+            "window_start": window_start,
+            "runs": 0,
+            "failed_runs": 0,
+            "outcomes": {},
+            "failures": {},
+            "prev_failures": [],
+            "prev_run_pass_rate": None,
+        }
+
+    def __load_state(self, now: float) -> Dict[str, Any]:
+        try:
+            with open(self.__state_path, encoding="utf8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return self.__make_empty_state(now)
+
+        if state.get("runs", 0) == 0:
+            # the window of a digest starts with the first run
+            state["window_start"] = now
+
+        return state
+
+    def __save_state(self, state: Mapping[str, Any]) -> None:
+        os.makedirs(self.__store_dir, exist_ok=True)
+
+        tmp_path = f"{self.__state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf8") as f:
+            json.dump(state, f)
+
+        os.replace(tmp_path, self.__state_path)
+
+
+def _format_datetime(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%d. %b %H:%M")
+
+
+def make_digest_message(digest: Digest, max_len: int) -> Tuple[str, Embed]:
+    header = "test digest: {} runs from {} to {}".format(
+        digest.runs, _format_datetime(digest.window_start), _format_datetime(digest.window_end)
+    )
+
+    pass_rate_line = "runs passed: {}/{} ({:.1f}%)".format(
+        digest.runs - digest.failed_runs, digest.runs, digest.run_pass_rate
+    )
+    if digest.prev_run_pass_rate is not None:
+        pass_rate_line += " {:+.1f}% from the previous digest".format(
+            digest.run_pass_rate - digest.prev_run_pass_rate
+        )
+
+    lines = [
+        pass_rate_line,
+        ", ".join(f"{ct} {outcome}" for outcome, ct in digest.outcomes.items() if ct > 0),
+    ]
+
+    if digest.failures:
+        lines.append("\n**most failing tests**")
+        most_failures = sorted(digest.failures.items(), key=lambda item: (-item[1], item[0]))
+        for nodeid, count in most_failures[:MAX_DIGEST_TESTS]:
+            lines.append(f"`{nodeid}`: failed in {count}/{digest.runs} runs")
+
+    if digest.new_failures:
+        lines.append("\n**newly failing tests**")
+        for nodeid in digest.new_failures[:MAX_DIGEST_TESTS]:
+            lines.append(f"`{nodeid}`")
+
+        if len(digest.new_failures) > MAX_DIGEST_TESTS:
+            lines.append(f"and other {len(digest.new_failures) - MAX_DIGEST_TESTS} tests")
+
+    colour = Colour.RED if digest.failed_runs else Colour.GREEN
+
+    return (header, Embed(description="\n".join(lines)[:max_len], colour=colour))
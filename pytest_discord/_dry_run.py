@@ -0,0 +1,47 @@
+import json
+import os
+from typing import Any, Dict, List, Sequence
+
+from ._attachment import Attachment
+
+
+PAYLOAD_FILENAME = "payload.json"
+OWNER_PAYLOADS_FILENAME = "owner_payloads.json"
+
+
+def _dump_json(path: str, data: Any) -> int:
+    text = json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+
+    with open(path, "w", encoding="utf8") as f:
+        f.write(text)
+
+    return len(text.encode("utf8"))
+
+
+def write_dry_run(
+    out_dir: str,
+    payload: Dict[str, Any],
+    attachments: Sequence[Attachment],
+    owner_payloads: List[Dict[str, Any]],
+) -> int:
+    """
+    Write a webhook payload and its attachments to a directory instead of sending them.
+
+    Returns:
+        Total size of the written files in bytes.
+    """
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    total_size = _dump_json(os.path.join(out_dir, PAYLOAD_FILENAME), payload)
+
+    for attachment in attachments:
+        with open(os.path.join(out_dir, os.path.basename(attachment.filename)), "wb") as f:
+            f.write(attachment.data)
+
+        total_size += len(attachment.data)
+
+    if owner_payloads:
+        total_size += _dump_json(os.path.join(out_dir, OWNER_PAYLOADS_FILENAME), owner_payloads)
+
+    return total_size
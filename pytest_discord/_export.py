@@ -0,0 +1,160 @@
+import gzip
+import io
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from _pytest.reports import TestReport
+
+
+EXPORT_BATCH_SIZE = 1024
+
+
+def extract_outcome(report: TestReport) -> Optional[str]:
+    if report.when == "call":
+        if hasattr(report, "wasxfail"):
+            return "xfailed" if report.skipped else "xpassed"
+
+        return report.outcome
+
+    if report.failed:
+        return "error"
+
+    if report.skipped:
+        return "xfailed" if hasattr(report, "wasxfail") else "skipped"
+
+    return None
+
+
+def make_failure_signature(report: TestReport) -> Optional[str]:
+    if not report.failed or not report.longrepr:
+        return None
+
+    reprcrash = getattr(report.longrepr, "reprcrash", None)
+    if reprcrash is not None and reprcrash.message:
+        message = reprcrash.message
+    else:
+        message = str(report.longrepr).strip()
+
+    lines = message.splitlines()
+
+    return lines[0] if lines else ""
+
+
+class NdjsonExporter:
+    """
+    Write test results as NDJSON records.
+    Records are queued by pytest hooks and written in batches by a background thread.
+    If ``fsync_interval`` is set, written batches are synced to the disk at most once
+    per the interval and at the end.
+    """
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def stat_count_map(self) -> Dict[str, int]:
+        return dict(self.__stat_count_map)
+
+    def __init__(self, path: str, fsync_interval: Optional[float] = None) -> None:
+        self.__path = path
+        self.__fsync_interval = fsync_interval
+        self.__queue: "queue.SimpleQueue[Optional[Dict[str, Any]]]" = queue.SimpleQueue()
+        self.__stat_count_map: Dict[str, int] = defaultdict(int)
+        self.__start_time = time.time()
+        self.__is_closed = False
+
+        self.__writer = threading.Thread(
+            target=self.__write_records, name="pytest-discord-export", daemon=True
+        )
+        self.__writer.start()
+
+    def pytest_sessionstart(self) -> None:
+        self.__start_time = time.time()
+
+    def pytest_runtest_logreport(self, report: TestReport) -> None:
+        outcome = extract_outcome(report)
+        if outcome is None:
+            return
+
+        self.__stat_count_map[outcome] += 1
+        self.__queue.put(
+            {
+                "type": "test",
+                "nodeid": report.nodeid,
+                "when": report.when,
+                "outcome": outcome,
+                "duration": report.duration,
+                "signature": make_failure_signature(report),
+            }
+        )
+
+    def pytest_sessionfinish(self, exitstatus: int) -> None:
+        self.close(exitstatus)
+
+    def pytest_unconfigure(self) -> None:
+        self.close()
+
+    def close(self, exitstatus: Optional[int] = None) -> None:
+        if self.__is_closed:
+            return
+
+        self.__is_closed = True
+        self.__queue.put(
+            {
+                "type": "summary",
+                "outcomes": self.stat_count_map,
+                "tests": sum(self.__stat_count_map.values()),
+                "duration": time.time() - self.__start_time,
+                "exitstatus": None if exitstatus is None else int(exitstatus),
+            }
+        )
+        self.__queue.put(None)
+        self.__writer.join()
+
+    def compress(self) -> bytes:
+        buf = io.BytesIO()
+
+        with open(self.__path, "rb") as src, gzip.GzipFile(fileobj=buf, mode="wb") as dst:
+            shutil.copyfileobj(src, dst)
+
+        return buf.getvalue()
+
+    def __write_records(self) -> None:
+        dirname = os.path.dirname(self.__path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+
+        last_fsync_time = time.monotonic()
+
+        with open(self.__path, "w", encoding="utf8") as f:
+            while True:
+                batch: List[Optional[Dict[str, Any]]] = [self.__queue.get()]
+
+                while len(batch) < EXPORT_BATCH_SIZE:
+                    try:
+                        batch.append(self.__queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                lines = [json.dumps(record) for record in batch if record is not None]
+                if lines:
+                    f.write("\n".join(lines) + "\n")
+                    f.flush()
+
+                is_last = None in batch
+
+                if self.__fsync_interval is not None and (
+                    is_last or time.monotonic() - last_fsync_time >= self.__fsync_interval
+                ):
+                    os.fsync(f.fileno())
+                    last_fsync_time = time.monotonic()
+
+                if is_last:
+                    return
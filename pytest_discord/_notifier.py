@@ -0,0 +1,111 @@
+import asyncio
+import atexit
+import os
+import threading
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+import aiohttp
+
+from ._owners import OwnersMatcher
+
+
+T = TypeVar("T")
+
+SHUTDOWN_TIMEOUT = 5.0
+
+
+class PersistentNotifier:
+    """
+    A process-level notifier for pytest sessions repeated in a long-lived process.
+
+    The notifier keeps an event loop on a daemon thread and an aiohttp session
+    (and its connection pool) across sessions, instead of creating them per session.
+    It also remembers the last notified outcome per webhook to send only changes.
+    """
+
+    def __init__(self) -> None:
+        self.__loop = asyncio.new_event_loop()
+        self.__thread = threading.Thread(
+            target=self.__loop.run_forever, name="pytest-discord-notifier", daemon=True
+        )
+        self.__thread.start()
+        self.__lock = threading.Lock()
+        self.__session: Optional[aiohttp.ClientSession] = None
+        self.__outcomes: Dict[str, Hashable] = {}
+        self.__owners_matchers: Dict[str, Tuple[float, OwnersMatcher]] = {}
+        self.__is_closed = False
+
+    def run(self, make_coro: Callable[[aiohttp.ClientSession], Awaitable[T]]) -> T:
+        """
+        Run a coroutine with the shared session on the loop of the notifier
+        and wait for the result.
+        """
+
+        async def run_with_session() -> T:
+            if self.__session is None or self.__session.closed:
+                self.__session = aiohttp.ClientSession()
+
+            return await make_coro(self.__session)
+
+        if self.__is_closed:
+            raise RuntimeError("the notifier is already closed")
+
+        return asyncio.run_coroutine_threadsafe(run_with_session(), self.__loop).result()
+
+    def is_outcome_changed(self, url: str, outcome: Hashable) -> bool:
+        with self.__lock:
+            return self.__outcomes.get(url) != outcome
+
+    def store_outcome(self, url: str, outcome: Hashable) -> None:
+        with self.__lock:
+            self.__outcomes[url] = outcome
+
+    def get_owners_matcher(self, path: str) -> OwnersMatcher:
+        mtime = os.stat(path).st_mtime
+
+        with self.__lock:
+            cached = self.__owners_matchers.get(path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+
+        matcher = OwnersMatcher.from_file(path)
+        with self.__lock:
+            self.__owners_matchers[path] = (mtime, matcher)
+
+        return matcher
+
+    def close(self) -> None:
+        if self.__is_closed:
+            return
+
+        self.__is_closed = True
+
+        async def close_session() -> None:
+            if self.__session is not None:
+                await self.__session.close()
+
+        try:
+            asyncio.run_coroutine_threadsafe(close_session(), self.__loop).result(SHUTDOWN_TIMEOUT)
+        except Exception:
+            # shut down regardless of pending requests
+            pass
+
+        self.__loop.call_soon_threadsafe(self.__loop.stop)
+        self.__thread.join(SHUTDOWN_TIMEOUT)
+        if not self.__thread.is_alive():
+            self.__loop.close()
+
+
+_notifier: Optional[PersistentNotifier] = None
+_notifier_lock = threading.Lock()
+
+
+def get_persistent_notifier() -> PersistentNotifier:
+    global _notifier
+
+    with _notifier_lock:
+        if _notifier is None:
+            _notifier = PersistentNotifier()
+            atexit.register(_notifier.close)
+
+        return _notifier
@@ -1,11 +1,12 @@
 import os
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional
 
 from _pytest.config import Config
 from typepy import Bool, Integer, StrictLevel
 from typepy.error import TypeConversionError
 
-from ._const import Default, Option
+from ._const import DedupMode, Default, Option, WebhookBackend
+from ._owners import OwnerRoute, parse_owner_routes
 
 
 class DiscordOptRetriever:
@@ -55,8 +56,111 @@ class DiscordOptRetriever:
         return self.__retrieve_discord_opt(Option.DISCORD_FAIL_ICON)
 
     def retrieve_attach_file(self) -> bool:
+        return self.__retrieve_bool_opt(Option.DISCORD_ATTACH_FILE)
+
+    def retrieve_attach_junitxml(self) -> bool:
+        return self.__retrieve_bool_opt(Option.DISCORD_ATTACH_JUNITXML)
+
+    def retrieve_attach_logs(self) -> bool:
+        return self.__retrieve_bool_opt(Option.DISCORD_ATTACH_LOGS)
+
+    def retrieve_backend(self) -> WebhookBackend:
+        value = self.__retrieve_discord_opt(Option.DISCORD_BACKEND)
+        if not value:
+            return WebhookBackend.BUILTIN
+
+        try:
+            return WebhookBackend(value.strip().lower())
+        except ValueError:
+            return WebhookBackend.BUILTIN
+
+    def retrieve_duration_regression(self) -> bool:
+        return self.__retrieve_bool_opt(Option.DISCORD_DURATION_REGRESSION)
+
+    def retrieve_resource_usage(self) -> bool:
+        return self.__retrieve_bool_opt(Option.DISCORD_RESOURCE_USAGE)
+
+    def retrieve_export_path(self) -> Optional[str]:
+        return self.__retrieve_discord_opt(Option.DISCORD_EXPORT)
+
+    def retrieve_attach_export(self) -> bool:
+        return self.__retrieve_bool_opt(Option.DISCORD_ATTACH_EXPORT)
+
+    def retrieve_dedup_mode(self) -> Optional[DedupMode]:
+        value = self.__retrieve_discord_opt(Option.DISCORD_DEDUP)
+        if not value:
+            return None
+
+        try:
+            return DedupMode(value.strip().lower())
+        except ValueError:
+            return None
+
+    def retrieve_dedup_dir(self) -> Optional[str]:
+        return self.__retrieve_discord_opt(Option.DISCORD_DEDUP_DIR)
+
+    def retrieve_dedup_ttl(self) -> int:
+        ttl = self.__retrieve_int_opt(Option.DISCORD_DEDUP_TTL)
+        if ttl is None or ttl < 0:
+            return Default.DEDUP_TTL
+
+        return ttl
+
+    def retrieve_digest_dir(self) -> Optional[str]:
+        return self.__retrieve_discord_opt(Option.DISCORD_DIGEST)
+
+    def retrieve_digest_window(self) -> int:
+        window = self.__retrieve_int_opt(Option.DISCORD_DIGEST_WINDOW)
+        if window is None or window < 0:
+            return Default.DIGEST_WINDOW
+
+        return window
+
+    def retrieve_checkpoint_path(self) -> Optional[str]:
+        return self.__retrieve_discord_opt(Option.DISCORD_CHECKPOINT)
+
+    def retrieve_owners_file(self) -> Optional[str]:
+        return self.__retrieve_discord_opt(Option.DISCORD_OWNERS_FILE)
+
+    def retrieve_owner_routes(self) -> Dict[str, OwnerRoute]:
+        config = self.__config
+        discord_opt = Option.DISCORD_OWNER_WEBHOOK
+        lines: Optional[List[str]] = getattr(config.option, discord_opt.inioption_str, None)
+
+        if not lines:
+            lines = os.environ.get(discord_opt.envvar_str, "").splitlines()
+
+        if not lines:
+            lines = config.getini(discord_opt.inioption_str)
+
+        return parse_owner_routes(lines or [])
+
+    def retrieve_persistent(self) -> bool:
+        return self.__retrieve_bool_opt(Option.DISCORD_PERSISTENT)
+
+    def retrieve_dry_run_dir(self) -> Optional[str]:
+        return self.__retrieve_discord_opt(Option.DISCORD_DRY_RUN)
+
+    def retrieve_notify_start(self) -> bool:
+        return self.__retrieve_bool_opt(Option.DISCORD_NOTIFY_START)
+
+    def __retrieve_int_opt(self, discord_opt: Option) -> Optional[int]:
+        config = self.__config
+        value = None
+
+        if hasattr(config.option, discord_opt.inioption_str):
+            value = getattr(config.option, discord_opt.inioption_str)
+
+        if value is None:
+            value = self._to_int(os.environ.get(discord_opt.envvar_str))
+
+        if value is None:
+            value = self._to_int(config.getini(discord_opt.inioption_str))
+
+        return value
+
+    def __retrieve_bool_opt(self, discord_opt: Option) -> bool:
         config = self.__config
-        discord_opt = Option.DISCORD_ATTACH_FILE
         value = None
 
         if hasattr(config.option, discord_opt.inioption_str):
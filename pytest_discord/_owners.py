@@ -0,0 +1,172 @@
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+
+class OwnerRoute(NamedTuple):
+    owner: str
+    webhook_url: str
+    mention: Optional[str]
+
+
+def glob_to_regex(pattern: str) -> str:
+    """
+    Translate a CODEOWNERS (gitignore-style) path pattern to a regular expression.
+
+    - a pattern without a slash except a trailing one matches at any depth
+    - a pattern matches a directory and everything under it
+    - ``*`` and ``?`` do not match ``/``, ``**`` matches across directories
+    """
+
+    is_dir = pattern.endswith("/")
+    is_anchored = "/" in pattern.rstrip("/")
+    pattern = pattern.strip("/")
+
+    regex = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            regex.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            regex.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            regex.append("[^/]")
+            i += 1
+        else:
+            regex.append(re.escape(pattern[i]))
+            i += 1
+
+    prefix = "" if is_anchored else "(?:.*/)?"
+    suffix = "/.*" if is_dir else "(?:/.*)?"
+
+    return prefix + "".join(regex) + suffix
+
+
+def parse_owners(lines: Iterable[str]) -> List[Tuple[str, Tuple[str, ...]]]:
+    rules = []
+
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+
+        pattern, *owners = line.split()
+        rules.append((pattern, tuple(owners)))
+
+    return rules
+
+
+def parse_owner_routes(lines: Iterable[str]) -> Dict[str, OwnerRoute]:
+    routes = {}
+
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        items = line.split(maxsplit=2)
+        if len(items) < 2:
+            continue
+
+        owner, webhook_url = items[:2]
+        routes[owner] = OwnerRoute(
+            owner, webhook_url, mention=items[2].strip() if len(items) > 2 else None
+        )
+
+    return routes
+
+
+def _split_literal_prefix(pattern: str) -> List[str]:
+    # unanchored patterns can match at any depth, so they have no literal prefix
+    if "/" not in pattern.rstrip("/"):
+        return []
+
+    prefix = []
+    for segment in pattern.strip("/").split("/")[:-1]:
+        if any(c in segment for c in "*?["):
+            break
+
+        prefix.append(segment)
+
+    return prefix
+
+
+class _TrieNode:
+    __slots__ = ("children", "rule_indexes")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.rule_indexes: List[int] = []
+
+
+class OwnersMatcher:
+    """
+    Find owners of test files by CODEOWNERS-style rules: the last matching rule wins.
+
+    Rules are compiled once and indexed in a trie by the literal leading directories of
+    their patterns, so a lookup only tries the rules along the path of a file.
+    Owners are cached per file.
+    """
+
+    def __init__(self, rules: Sequence[Tuple[str, Tuple[str, ...]]]) -> None:
+        self.__owners_list = [owners for _, owners in rules]
+        self.__regexes = [re.compile(glob_to_regex(pattern)) for pattern, _ in rules]
+        self.__root = _TrieNode()
+        self.__cache: Dict[str, Tuple[str, ...]] = {}
+
+        for i, (pattern, _) in enumerate(rules):
+            node = self.__root
+            for segment in _split_literal_prefix(pattern):
+                node = node.children.setdefault(segment, _TrieNode())
+
+            node.rule_indexes.append(i)
+
+    @classmethod
+    def from_file(cls, path: str) -> "OwnersMatcher":
+        with open(path, encoding="utf8") as f:
+            return cls(parse_owners(f))
+
+    def match(self, path: str) -> Tuple[str, ...]:
+        owners = self.__cache.get(path)
+        if owners is not None:
+            return owners
+
+        owners = ()
+        for i in sorted(self.__find_candidates(path), reverse=True):
+            if self.__regexes[i].fullmatch(path):
+                owners = self.__owners_list[i]
+                break
+
+        self.__cache[path] = owners
+
+        return owners
+
+    def __find_candidates(self, path: str) -> List[int]:
+        node = self.__root
+        candidates = list(node.rule_indexes)
+
+        for segment in path.split("/")[:-1]:
+            child: Optional[_TrieNode] = node.children.get(segment)
+            if child is None:
+                break
+
+            node = child
+            candidates.extend(node.rule_indexes)
+
+        return candidates
+
+    def owners_of(self, nodeid: str) -> Tuple[str, ...]:
+        return self.match(nodeid.split("::", 1)[0])
+
+    def group_by_owner(self, nodeids: Iterable[str]) -> Dict[str, List[str]]:
+        groups: Dict[str, List[str]] = {}
+
+        for nodeid in nodeids:
+            for owner in self.owners_of(nodeid):
+                groups.setdefault(owner, []).append(nodeid)
+
+        return groups
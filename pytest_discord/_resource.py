@@ -0,0 +1,109 @@
+import heapq
+import os
+import sys
+import time
+from typing import Generator, List, NamedTuple, Optional, Tuple
+
+import pytest
+from _pytest.nodes import Item
+
+
+TOP_K = 5
+
+# the second field is the current resident set size in pages (Linux only)
+_STATM_PATH = "/proc/self/statm"
+
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+_MAXRSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+if sys.platform == "win32":
+    # neither the resource module nor /proc is available
+
+    def _get_max_rss() -> int:
+        return 0
+
+    def _open_statm() -> Optional[int]:
+        return None
+
+    def _read_statm_rss(fd: int) -> int:
+        return 0
+
+else:
+    import resource
+
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+    def _get_max_rss() -> int:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_UNIT
+
+    def _open_statm() -> Optional[int]:
+        try:
+            return os.open(_STATM_PATH, os.O_RDONLY)
+        except OSError:
+            return None
+
+    def _read_statm_rss(fd: int) -> int:
+        return int(os.pread(fd, 128, 0).split()[1]) * _PAGE_SIZE
+
+
+class ResourceUsage(NamedTuple):
+    nodeid: str
+    value: float
+
+
+class ResourceSampler:
+    """
+    Measure CPU time and RSS increase of each test at the boundaries of
+    ``pytest_runtest_protocol`` without background sampling,
+    and keep the top-K heaviest tests in bounded heaps.
+    RSS is read from ``/proc/self/statm`` where available,
+    otherwise the increase of the peak RSS (``ru_maxrss``) is measured.
+    """
+
+    def __init__(self, top_k: int = TOP_K) -> None:
+        self.__top_k = top_k
+        self.__cpu_time_heap: List[Tuple[float, str]] = []
+        self.__rss_heap: List[Tuple[float, str]] = []
+        self.__statm_fd = _open_statm()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: Item) -> Generator[None, None, None]:
+        rss = self.__get_rss()
+        cpu_time = time.process_time()
+
+        yield
+
+        cpu_time = time.process_time() - cpu_time
+        rss = self.__get_rss() - rss
+
+        self.__push(self.__cpu_time_heap, cpu_time, item.nodeid)
+        if rss > 0:
+            self.__push(self.__rss_heap, rss, item.nodeid)
+
+    def pytest_unconfigure(self) -> None:
+        if self.__statm_fd is not None:
+            os.close(self.__statm_fd)
+            self.__statm_fd = None
+
+    def top_cpu_time(self) -> List[ResourceUsage]:
+        return self.__to_usages(self.__cpu_time_heap)
+
+    def top_rss(self) -> List[ResourceUsage]:
+        return self.__to_usages(self.__rss_heap)
+
+    def __get_rss(self) -> int:
+        if self.__statm_fd is None:
+            return _get_max_rss()
+
+        return _read_statm_rss(self.__statm_fd)
+
+    def __push(self, heap: List[Tuple[float, str]], value: float, nodeid: str) -> None:
+        if len(heap) < self.__top_k:
+            heapq.heappush(heap, (value, nodeid))
+        elif value > heap[0][0]:
+            heapq.heapreplace(heap, (value, nodeid))
+
+    @staticmethod
+    def __to_usages(heap: List[Tuple[float, str]]) -> List[ResourceUsage]:
+        return [ResourceUsage(nodeid, value) for value, nodeid in sorted(heap, reverse=True)]
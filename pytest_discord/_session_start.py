@@ -0,0 +1,87 @@
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from _pytest.main import Session
+
+from ._baseline import DurationEstimate, estimate_duration
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m {seconds:02d}s"
+
+    return f"{minutes}m {seconds:02d}s"
+
+
+def make_start_message(tests: int, estimate: Optional[DurationEstimate], start_time: float) -> str:
+    header = f"test session started: {tests} tests"
+
+    if estimate is None:
+        return f"{header}, no duration baselines to estimate the finish time yet"
+
+    header += ", estimated {} (finish at {})".format(
+        _format_duration(estimate.seconds),
+        datetime.fromtimestamp(start_time + estimate.seconds).strftime("%d. %b %H:%M"),
+    )
+    if estimate.unknown:
+        header += f", {estimate.unknown} tests without baselines"
+
+    return header
+
+
+class SessionStartNotifier:
+    """
+    Send a message with the number of collected tests and an estimated finish time
+    when the collection finishes.
+    The estimate and the message are processed on a background thread,
+    so tests start without waiting for them.
+    """
+
+    def __init__(
+        self, baseline_path: str, send: Callable[[str, Callable[[str], None]], bool]
+    ) -> None:
+        self.__baseline_path = baseline_path
+        self.__send = send
+        self.__thread: Optional[threading.Thread] = None
+        self.__lines: List[str] = []
+
+    def pytest_collection_finish(self, session: Session) -> None:
+        if self.__thread is not None:
+            return
+
+        self.__thread = threading.Thread(
+            target=self.__notify,
+            args=([item.nodeid for item in session.items], time.time()),
+            name="pytest-discord-session-start",
+            daemon=True,
+        )
+        self.__thread.start()
+
+    def join(self, write_line: Callable[[str], None], timeout: float) -> None:
+        if self.__thread is None:
+            return
+
+        self.__thread.join(timeout)
+        if self.__thread.is_alive():
+            write_line(
+                f"pytest-discord error: sending the start notification timed out ({timeout} sec)"
+            )
+
+        # outputs of the background thread are written after the session to keep them in order
+        for line in list(self.__lines):
+            write_line(line)
+
+    def __notify(self, nodeids: List[str], start_time: float) -> None:
+        estimate = estimate_duration(self.__baseline_path, set(nodeids))
+
+        try:
+            self.__send(make_start_message(len(nodeids), estimate, start_time), self.__lines.append)
+        except Exception as e:
+            self.__lines.append(f"pytest-discord error: {str(e)}")
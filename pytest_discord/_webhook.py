@@ -0,0 +1,167 @@
+import asyncio
+import io
+import json
+import re
+from enum import IntEnum, unique
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+
+
+MAX_RATE_LIMIT_RETRIES = 3
+
+_re_webhook_url = re.compile(
+    r"^https?://[^/]+/api/(?:v\d+/)?webhooks/(?P<id>[0-9]{17,20})/(?P<token>[A-Za-z0-9\.\-\_]{60,})/?(?P<query>\?.*)?$"
+)
+
+WebhookFile = Tuple[str, io.BufferedIOBase]
+
+
+@unique
+class Colour(IntEnum):
+    GREEN = 0x2ECC71
+    GOLD = 0xF1C40F
+    RED = 0xE74C3C
+
+
+class Embed:
+    def __init__(self, description: str, colour: int) -> None:
+        self.description = description
+        self.colour = colour
+        self.footer_text: Optional[str] = None
+
+    def set_footer(self, text: str) -> None:
+        self.footer_text = text
+
+    def to_dict(self) -> Dict[str, Any]:
+        embed: Dict[str, Any] = {
+            "type": "rich",
+            "description": self.description,
+            "color": int(self.colour),
+        }
+
+        if self.footer_text:
+            embed["footer"] = {"text": self.footer_text}
+
+        return embed
+
+
+class WebhookError(Exception):
+    def __init__(self, status: int, reason: Optional[str], text: str) -> None:
+        super().__init__(f"{status} {reason or ''}: {text}")
+
+        self.status = status
+
+
+def make_payload(
+    content: str,
+    username: Optional[str] = None,
+    avatar_url: Optional[str] = None,
+    embeds: Sequence[Embed] = (),
+    filenames: Sequence[str] = (),
+) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {"content": content}
+
+    if username:
+        payload["username"] = username
+    if avatar_url:
+        payload["avatar_url"] = avatar_url
+    if embeds:
+        payload["embeds"] = [embed.to_dict() for embed in embeds]
+    if filenames:
+        payload["attachments"] = [
+            {"id": i, "filename": filename} for i, filename in enumerate(filenames)
+        ]
+
+    return payload
+
+
+class WebhookClient:
+    """
+    A minimal Discord webhook client on top of an aiohttp session.
+    Connections are pooled by the session, and file bodies are streamed from file objects.
+    """
+
+    @property
+    def url(self) -> str:
+        return self.__url
+
+    def __init__(self, url: str, session: aiohttp.ClientSession) -> None:
+        if not _re_webhook_url.match(url):
+            raise ValueError("Invalid webhook URL given.")
+
+        # keep the query (e.g. thread_id to post to a thread) for the request
+        path, sep, query = url.partition("?")
+        self.__url = path.rstrip("/") + sep + query
+        self.__session = session
+
+    async def send(
+        self,
+        content: str,
+        username: Optional[str] = None,
+        avatar_url: Optional[str] = None,
+        embeds: Sequence[Embed] = (),
+        files: Sequence[WebhookFile] = (),
+    ) -> None:
+        payload = make_payload(
+            content,
+            username=username,
+            avatar_url=avatar_url,
+            embeds=embeds,
+            filenames=[filename for filename, _ in files],
+        )
+
+        for _ in range(MAX_RATE_LIMIT_RETRIES + 1):
+            async with self.__session.post(
+                self.__url, **self.__make_body(payload, files)
+            ) as response:
+                if response.status == 429:
+                    await asyncio.sleep(await self.__extract_retry_after(response))
+                    continue
+
+                if response.status >= 400:
+                    raise WebhookError(response.status, response.reason, await response.text())
+
+                return
+
+        raise WebhookError(429, "Too Many Requests", "exceeded the retry limit of rate limits")
+
+    @staticmethod
+    def __make_body(payload: Dict[str, Any], files: Sequence[WebhookFile]) -> Dict[str, Any]:
+        if not files:
+            return {"json": payload}
+
+        form = aiohttp.FormData()
+        form.add_field("payload_json", json.dumps(payload), content_type="application/json")
+
+        for i, (filename, fp) in enumerate(files):
+            fp.seek(0)
+            form.add_field(
+                f"files[{i}]", fp, filename=filename, content_type="application/octet-stream"
+            )
+
+        return {"data": form}
+
+    @staticmethod
+    async def __extract_retry_after(response: aiohttp.ClientResponse) -> float:
+        try:
+            body: Dict[str, Any] = await response.json()
+            return float(body["retry_after"])
+        except (aiohttp.ContentTypeError, ValueError, KeyError, TypeError):
+            pass
+
+        try:
+            return float(response.headers.get("Retry-After", 1))
+        except ValueError:
+            return 1.0
+
+
+def to_discord_py_args(
+    embeds: Sequence[Embed], files: Sequence[WebhookFile]
+) -> Tuple[List[Any], List[Any]]:
+    import discord
+
+    return (
+        [discord.Embed.from_dict(embed.to_dict()) for embed in embeds],
+        [discord.File(fp, filename) for filename, fp in files],
+    )
@@ -2,30 +2,97 @@ import asyncio
 import io
 import os
 import platform
+import signal
+import tempfile
+import threading
 import time
 from collections import defaultdict
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+from typing import (
+    AsyncIterator,
+    Callable,
+    Collection,
+    Coroutine,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
 
 import aiohttp
 import pytest
 from _pytest.config import Config
 from _pytest.config.argparsing import Parser
 from _pytest.terminal import TerminalReporter
-from discord import Colour, Embed, File, Webhook
-from discord.errors import Forbidden, HTTPException, NotFound
-from discord.utils import MISSING
 from pytablewriter.writer.text import MarkdownFlavor
 from pytest_md_report.plugin import extract_pytest_stats
 
-from ._const import HelpMsg, Option, TestResultType
+from ._attachment import (
+    Attachment,
+    AttachmentBuilder,
+    make_junitxml_attachment,
+    make_logs_attachment,
+    pack_attachments,
+)
+from ._baseline import DurationRecorder, DurationRegression
+from ._checkpoint import CHECKPOINT_FSYNC_INTERVAL
+from ._const import (
+    AttachmentPriority,
+    DedupMode,
+    HelpMsg,
+    NotifyStatus,
+    Option,
+    TestResultType,
+    WebhookBackend,
+)
+from ._dedup import DedupCache, make_dedup_key
+from ._digest import DigestStore, make_digest_message
+from ._dry_run import write_dry_run
+from ._export import NdjsonExporter, make_failure_signature
+from ._notifier import PersistentNotifier, get_persistent_notifier
 from ._opt_retriever import DiscordOptRetriever
+from ._owners import OwnersMatcher
+from ._resource import ResourceSampler
+from ._session_start import SessionStartNotifier
+from ._webhook import (
+    Colour,
+    Embed,
+    WebhookClient,
+    WebhookError,
+    WebhookFile,
+    make_payload,
+    to_discord_py_args,
+)
 
 
 MAX_EMBED_LEN = 2048
 MAX_EMBEDS_LEN = 6000
 MAX_EMBED_CT = 10
 
+EXPORTER_PLUGIN_NAME = "discord-exporter"
+CHECKPOINT_PLUGIN_NAME = "discord-checkpoint"
+DURATION_RECORDER_PLUGIN_NAME = "discord-duration-recorder"
+RESOURCE_SAMPLER_PLUGIN_NAME = "discord-resource-sampler"
+SESSION_START_NOTIFIER_PLUGIN_NAME = "discord-session-start-notifier"
+
+MAX_DURATION_REGRESSIONS = 20
+
+PARTIAL_SEND_TIMEOUT = 5.0
+
+T = TypeVar("T")
+
+
+class OwnerMessage(NamedTuple):
+    owner: str
+    url: str
+    header: str
+    embeds: List[Embed]
+
 
 def pytest_addoption(parser: Parser) -> None:
     group = parser.getgroup("discord", "notify test results to a discord channel")
@@ -74,6 +141,129 @@ def pytest_addoption(parser: Parser) -> None:
         help=Option.DISCORD_ATTACH_FILE.help_msg
         + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.DISCORD_ATTACH_FILE.envvar_str),
     )
+    group.addoption(
+        Option.DISCORD_ATTACH_JUNITXML.cmdoption_str,
+        action="store_true",
+        default=None,
+        help=Option.DISCORD_ATTACH_JUNITXML.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.DISCORD_ATTACH_JUNITXML.envvar_str),
+    )
+    group.addoption(
+        Option.DISCORD_ATTACH_LOGS.cmdoption_str,
+        action="store_true",
+        default=None,
+        help=Option.DISCORD_ATTACH_LOGS.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.DISCORD_ATTACH_LOGS.envvar_str),
+    )
+    group.addoption(
+        Option.DISCORD_BACKEND.cmdoption_str,
+        metavar="BACKEND",
+        choices=[backend.value for backend in WebhookBackend],
+        help=Option.DISCORD_BACKEND.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.DISCORD_BACKEND.envvar_str),
+    )
+    group.addoption(
+        Option.DISCORD_DURATION_REGRESSION.cmdoption_str,
+        action="store_true",
+        default=None,
+        help=Option.DISCORD_DURATION_REGRESSION.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.DISCORD_DURATION_REGRESSION.envvar_str),
+    )
+    group.addoption(
+        Option.DISCORD_RESOURCE_USAGE.cmdoption_str,
+        action="store_true",
+        default=None,
+        help=Option.DISCORD_RESOURCE_USAGE.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.DISCORD_RESOURCE_USAGE.envvar_str),
+    )
+    group.addoption(
+        Option.DISCORD_EXPORT.cmdoption_str,
+        metavar="PATH",
+        help=Option.DISCORD_EXPORT.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.DISCORD_EXPORT.envvar_str),
+    )
+    group.addoption(
+        Option.DISCORD_ATTACH_EXPORT.cmdoption_str,
+        action="store_true",
+        default=None,
+        help=Option.DISCORD_ATTACH_EXPORT.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.DISCORD_ATTACH_EXPORT.envvar_str),
+    )
+    group.addoption(
+        Option.DISCORD_DEDUP.cmdoption_str,
+        metavar="MODE",
+        choices=[mode.value for mode in DedupMode],
+        help=Option.DISCORD_DEDUP.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.DISCORD_DEDUP.envvar_str),
+    )
+    group.addoption(
+        Option.DISCORD_DEDUP_DIR.cmdoption_str,
+        metavar="DIR",
+        help=Option.DISCORD_DEDUP_DIR.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.DISCORD_DEDUP_DIR.envvar_str),
+    )
+    group.addoption(
+        Option.DISCORD_DEDUP_TTL.cmdoption_str,
+        metavar="SECONDS",
+        type=int,
+        default=None,
+        help=Option.DISCORD_DEDUP_TTL.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.DISCORD_DEDUP_TTL.envvar_str),
+    )
+    group.addoption(
+        Option.DISCORD_DIGEST.cmdoption_str,
+        metavar="DIR",
+        help=Option.DISCORD_DIGEST.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.DISCORD_DIGEST.envvar_str),
+    )
+    group.addoption(
+        Option.DISCORD_DIGEST_WINDOW.cmdoption_str,
+        metavar="SECONDS",
+        type=int,
+        default=None,
+        help=Option.DISCORD_DIGEST_WINDOW.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.DISCORD_DIGEST_WINDOW.envvar_str),
+    )
+    group.addoption(
+        Option.DISCORD_CHECKPOINT.cmdoption_str,
+        metavar="PATH",
+        help=Option.DISCORD_CHECKPOINT.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.DISCORD_CHECKPOINT.envvar_str),
+    )
+    group.addoption(
+        Option.DISCORD_OWNERS_FILE.cmdoption_str,
+        metavar="PATH",
+        help=Option.DISCORD_OWNERS_FILE.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.DISCORD_OWNERS_FILE.envvar_str),
+    )
+    group.addoption(
+        Option.DISCORD_OWNER_WEBHOOK.cmdoption_str,
+        metavar="ROUTE",
+        action="append",
+        default=None,
+        help=Option.DISCORD_OWNER_WEBHOOK.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.DISCORD_OWNER_WEBHOOK.envvar_str),
+    )
+    group.addoption(
+        Option.DISCORD_PERSISTENT.cmdoption_str,
+        action="store_true",
+        default=None,
+        help=Option.DISCORD_PERSISTENT.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.DISCORD_PERSISTENT.envvar_str),
+    )
+    group.addoption(
+        Option.DISCORD_DRY_RUN.cmdoption_str,
+        metavar="DIR",
+        help=Option.DISCORD_DRY_RUN.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.DISCORD_DRY_RUN.envvar_str),
+    )
+    group.addoption(
+        Option.DISCORD_NOTIFY_START.cmdoption_str,
+        action="store_true",
+        default=None,
+        help=Option.DISCORD_NOTIFY_START.help_msg
+        + HelpMsg.EXTRA_MSG_TEMPLATE.format(Option.DISCORD_NOTIFY_START.envvar_str),
+    )
 
     parser.addini(
         Option.DISCORD_WEBHOOK.inioption_str,
@@ -111,6 +301,233 @@ def pytest_addoption(parser: Parser) -> None:
         default=None,
         help=Option.DISCORD_ATTACH_FILE.help_msg,
     )
+    parser.addini(
+        Option.DISCORD_ATTACH_JUNITXML.inioption_str,
+        type="bool",
+        default=None,
+        help=Option.DISCORD_ATTACH_JUNITXML.help_msg,
+    )
+    parser.addini(
+        Option.DISCORD_ATTACH_LOGS.inioption_str,
+        type="bool",
+        default=None,
+        help=Option.DISCORD_ATTACH_LOGS.help_msg,
+    )
+    parser.addini(
+        Option.DISCORD_BACKEND.inioption_str,
+        default=None,
+        help=Option.DISCORD_BACKEND.help_msg,
+    )
+    parser.addini(
+        Option.DISCORD_DURATION_REGRESSION.inioption_str,
+        type="bool",
+        default=None,
+        help=Option.DISCORD_DURATION_REGRESSION.help_msg,
+    )
+    parser.addini(
+        Option.DISCORD_RESOURCE_USAGE.inioption_str,
+        type="bool",
+        default=None,
+        help=Option.DISCORD_RESOURCE_USAGE.help_msg,
+    )
+    parser.addini(
+        Option.DISCORD_EXPORT.inioption_str,
+        default=None,
+        help=Option.DISCORD_EXPORT.help_msg,
+    )
+    parser.addini(
+        Option.DISCORD_ATTACH_EXPORT.inioption_str,
+        type="bool",
+        default=None,
+        help=Option.DISCORD_ATTACH_EXPORT.help_msg,
+    )
+    parser.addini(
+        Option.DISCORD_DEDUP.inioption_str,
+        default=None,
+        help=Option.DISCORD_DEDUP.help_msg,
+    )
+    parser.addini(
+        Option.DISCORD_DEDUP_DIR.inioption_str,
+        default=None,
+        help=Option.DISCORD_DEDUP_DIR.help_msg,
+    )
+    parser.addini(
+        Option.DISCORD_DEDUP_TTL.inioption_str,
+        default=None,
+        help=Option.DISCORD_DEDUP_TTL.help_msg,
+    )
+    parser.addini(
+        Option.DISCORD_DIGEST.inioption_str,
+        default=None,
+        help=Option.DISCORD_DIGEST.help_msg,
+    )
+    parser.addini(
+        Option.DISCORD_DIGEST_WINDOW.inioption_str,
+        default=None,
+        help=Option.DISCORD_DIGEST_WINDOW.help_msg,
+    )
+    parser.addini(
+        Option.DISCORD_CHECKPOINT.inioption_str,
+        default=None,
+        help=Option.DISCORD_CHECKPOINT.help_msg,
+    )
+    parser.addini(
+        Option.DISCORD_OWNERS_FILE.inioption_str,
+        default=None,
+        help=Option.DISCORD_OWNERS_FILE.help_msg,
+    )
+    parser.addini(
+        Option.DISCORD_OWNER_WEBHOOK.inioption_str,
+        type="linelist",
+        default=[],
+        help=Option.DISCORD_OWNER_WEBHOOK.help_msg,
+    )
+    parser.addini(
+        Option.DISCORD_PERSISTENT.inioption_str,
+        type="bool",
+        default=None,
+        help=Option.DISCORD_PERSISTENT.help_msg,
+    )
+    parser.addini(
+        Option.DISCORD_DRY_RUN.inioption_str,
+        default=None,
+        help=Option.DISCORD_DRY_RUN.help_msg,
+    )
+    parser.addini(
+        Option.DISCORD_NOTIFY_START.inioption_str,
+        type="bool",
+        default=None,
+        help=Option.DISCORD_NOTIFY_START.help_msg,
+    )
+
+
+def pytest_configure(config: Config) -> None:
+    if config.option.help or hasattr(config, "workerinput"):
+        return
+
+    opt_retriever = DiscordOptRetriever(config)
+
+    export_path = opt_retriever.retrieve_export_path()
+    if export_path:
+        config.pluginmanager.register(NdjsonExporter(export_path), EXPORTER_PLUGIN_NAME)
+
+    checkpoint_path = opt_retriever.retrieve_checkpoint_path()
+    if checkpoint_path:
+        config.pluginmanager.register(
+            NdjsonExporter(checkpoint_path, fsync_interval=CHECKPOINT_FSYNC_INTERVAL),
+            CHECKPOINT_PLUGIN_NAME,
+        )
+        _install_sigterm_handler()
+
+    if opt_retriever.retrieve_resource_usage():
+        config.pluginmanager.register(ResourceSampler(), RESOURCE_SAMPLER_PLUGIN_NAME)
+
+    notify_start = opt_retriever.retrieve_notify_start()
+
+    # duration baselines are also required to estimate durations of sessions
+    if opt_retriever.retrieve_duration_regression() or notify_start:
+        config.pluginmanager.register(
+            DurationRecorder(_get_duration_baseline_path(config)), DURATION_RECORDER_PLUGIN_NAME
+        )
+
+    url = opt_retriever.retrieve_webhook_url()
+    if (
+        notify_start
+        and url
+        and not opt_retriever.retrieve_digest_dir()
+        and not opt_retriever.retrieve_dry_run_dir()
+    ):
+        config.pluginmanager.register(
+            SessionStartNotifier(
+                _get_duration_baseline_path(config), _make_start_sender(opt_retriever, url)
+            ),
+            SESSION_START_NOTIFIER_PLUGIN_NAME,
+        )
+
+
+def _make_start_sender(
+    opt_retriever: DiscordOptRetriever, url: str
+) -> Callable[[str, Callable[[str], None]], bool]:
+    # options are resolved in advance since the sender is called from a background thread
+    username = opt_retriever.retrieve_username()
+    backend = opt_retriever.retrieve_backend()
+    notifier = get_persistent_notifier() if opt_retriever.retrieve_persistent() else None
+
+    def send(header: str, write_line: Callable[[str], None]) -> bool:
+        return _run_send(
+            notifier,
+            lambda session: _send_message(
+                write_line=write_line,
+                url=url,
+                header=header,
+                username=username,
+                avatar_url=None,
+                embeds=[],
+                backend=backend,
+                session=session,
+            ),
+        )
+
+    return send
+
+
+def _get_junitxml_path(config: Config) -> Optional[str]:
+    # junitxml resolves the path (e.g. '~' and environment variables) when it is configured
+    try:
+        from _pytest.junitxml import xml_key
+
+        xml = config.stash.get(xml_key, None)
+    except (ImportError, AttributeError):
+        xml = getattr(config, "_xml", None)
+
+    if xml is not None:
+        return xml.logfile
+
+    xml_path = getattr(config.option, "xmlpath", None)
+    if not xml_path:
+        return None
+
+    return os.path.normpath(os.path.abspath(os.path.expanduser(os.path.expandvars(xml_path))))
+
+
+def _get_duration_baseline_path(config: Config) -> str:
+    return os.path.join(_get_cache_dir(config, "duration"), "baseline.bin")
+
+
+_prev_sigterm_handler = None
+
+
+def _raise_keyboard_interrupt(signum, frame) -> None:
+    raise KeyboardInterrupt(f"received signal {signum}")
+
+
+def _install_sigterm_handler() -> None:
+    """
+    Handle SIGTERM, which is sent by CI runners at cancellation or timeout,
+    as KeyboardInterrupt to send partial results.
+    """
+
+    global _prev_sigterm_handler
+
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    if signal.getsignal(signal.SIGTERM) != signal.SIG_DFL:
+        return
+
+    _prev_sigterm_handler = signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+
+
+def _restore_sigterm_handler() -> None:
+    global _prev_sigterm_handler
+
+    if _prev_sigterm_handler is None:
+        return
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _prev_sigterm_handler)
+
+    _prev_sigterm_handler = None
 
 
 def _normalize_stat_name(name: str) -> str:
@@ -159,8 +576,21 @@ def _extract_longrepr(reporter: TerminalReporter) -> List[str]:
     return messages
 
 
+def _extract_failure_signatures(reporter: TerminalReporter) -> List[Tuple[str, Optional[str]]]:
+    signatures = []
+
+    for stat_key in ["failed", "error"]:
+        for report in reporter.stats.get(stat_key, []):
+            signatures.append((report.nodeid, make_failure_signature(report)))
+
+    return signatures
+
+
 def _extract_longrepr_embeds(
-    reporter: TerminalReporter, embed_len: int, colour: Colour
+    reporter: TerminalReporter,
+    embed_len: int,
+    colour: Colour,
+    nodeids: Optional[Collection[str]] = None,
 ) -> Tuple[List[Embed], bool]:
     embeds = []
     total_embed_len = embed_len
@@ -170,6 +600,9 @@ def _extract_longrepr_embeds(
         if not stat_key or stat_key not in ["failed", "error"]:
             continue
 
+        if nodeids is not None:
+            values = [value for value in values if getattr(value, "nodeid", None) in nodeids]
+
         for i, value in enumerate(values):
             try:
                 if not value.longrepr:
@@ -210,6 +643,104 @@ def _extract_longrepr_embeds(
     return embeds, exceeds_embeds_limit
 
 
+def _make_duration_regressions_embed(regressions: Sequence[DurationRegression]) -> Embed:
+    lines = [f"**{len(regressions)} tests are slower than their baselines**"]
+
+    for regression in regressions[:MAX_DURATION_REGRESSIONS]:
+        lines.append(
+            "`{}`: {:.2f}s (baseline {:.2f}s ± {:.2f}s)".format(
+                regression.nodeid, regression.duration, regression.mean, regression.stddev
+            )
+        )
+
+    if len(regressions) > MAX_DURATION_REGRESSIONS:
+        lines.append(f"and other {len(regressions) - MAX_DURATION_REGRESSIONS} tests")
+
+    return Embed(description="\n".join(lines)[:MAX_EMBED_LEN], colour=Colour.GOLD)
+
+
+def _make_resource_usage_embed(resource_sampler: ResourceSampler) -> Optional[Embed]:
+    lines = []
+
+    cpu_time_usages = resource_sampler.top_cpu_time()
+    if cpu_time_usages:
+        lines.append("**top CPU time**")
+        for usage in cpu_time_usages:
+            lines.append(f"`{usage.nodeid}`: {usage.value:.2f}s")
+
+    rss_usages = resource_sampler.top_rss()
+    if rss_usages:
+        lines.append("**top RSS increase**")
+        for usage in rss_usages:
+            lines.append(f"`{usage.nodeid}`: {usage.value / (1024 * 1024):.1f} MiB")
+
+    if not lines:
+        # no tests ran in this process (e.g. the controller of pytest-xdist)
+        return None
+
+    return Embed(description="\n".join(lines)[:MAX_EMBED_LEN], colour=Colour.GOLD)
+
+
+def _make_owner_messages(
+    opt_retriever: DiscordOptRetriever,
+    reporter: TerminalReporter,
+    header: str,
+    notifier: Optional[PersistentNotifier] = None,
+) -> List[OwnerMessage]:
+    owners_file = opt_retriever.retrieve_owners_file()
+    if not owners_file:
+        return []
+
+    routes = opt_retriever.retrieve_owner_routes()
+    if not routes:
+        return []
+
+    signatures = _extract_failure_signatures(reporter)
+    if not signatures:
+        return []
+
+    try:
+        if notifier is not None:
+            matcher = notifier.get_owners_matcher(owners_file)
+        else:
+            matcher = OwnersMatcher.from_file(owners_file)
+    except OSError as e:
+        reporter.write_line(f"pytest-discord error: failed to read the owners file: {e}")
+        return []
+
+    signature_map = dict(signatures)
+    messages = []
+
+    for owner, nodeids in matcher.group_by_owner(signature_map).items():
+        route = routes.get(owner)
+        if route is None:
+            continue
+
+        lines = [f"**{len(nodeids)} failed tests owned by {owner}**"]
+        for nodeid in nodeids:
+            signature = signature_map[nodeid]
+            lines.append(f"`{nodeid}`: {signature}" if signature else f"`{nodeid}`")
+
+        embed_failures = Embed(description="\n".join(lines)[:MAX_EMBED_LEN], colour=Colour.RED)
+        embeds, _ = _extract_longrepr_embeds(
+            reporter,
+            len(embed_failures.description),
+            colour=Colour.RED,
+            nodeids=set(nodeids),
+        )
+
+        messages.append(
+            OwnerMessage(
+                owner=owner,
+                url=route.webhook_url,
+                header=f"{route.mention} {header}" if route.mention else header,
+                embeds=[embed_failures] + embeds[: MAX_EMBED_CT - 1],
+            )
+        )
+
+    return messages
+
+
 def _is_ci() -> bool:
     CI = os.environ.get("CI")
     if not CI:
@@ -218,6 +749,14 @@ def _is_ci() -> bool:
     return CI.strip().lower() == "true"
 
 
+def _get_cache_dir(config: Config, name: str) -> str:
+    cache = getattr(config, "cache", None)
+    if cache is not None:
+        return str(cache.mkdir(f"discord-{name}"))
+
+    return os.path.join(tempfile.gettempdir(), "pytest-discord", name)
+
+
 def _make_md_report(config: Config, reporter: TerminalReporter) -> str:
     from pytest_md_report import ColorPolicy, ZerosRender, make_md_report, retrieve_stat_count_map
 
@@ -256,6 +795,17 @@ def _make_md_report(config: Config, reporter: TerminalReporter) -> str:
         config.option.md_report_zeros = stash_md_report_zeros
 
 
+def _make_md_attachment(
+    config: Config, reporter: TerminalReporter, header: str, start_datetime: datetime
+) -> Attachment:
+    md_report = _make_md_report(config, reporter)
+    md_text = "# {}\n{}\n\n{}".format(header, md_report, "\n\n".join(_extract_longrepr(reporter)))
+
+    return Attachment(
+        start_datetime.strftime("pytest_%Y-%m-%dT%H:%M:%S.md"), md_text.encode("utf8")
+    )
+
+
 def _make_header(tests: int) -> str:
     msgs = [f"{tests} tests"]
 
@@ -309,58 +859,185 @@ def extract_result_type(pytest_stats: Mapping[str, int]) -> TestResultType:
 
 
 _result_type_to_colour = {
-    TestResultType.SUCCESS: Colour.green(),
-    TestResultType.SKIP: Colour.gold(),
-    TestResultType.FAIL: Colour.red(),
+    TestResultType.SUCCESS: Colour.GREEN,
+    TestResultType.SKIP: Colour.GOLD,
+    TestResultType.FAIL: Colour.RED,
 }
 
 
+def _is_interrupted(reporter: TerminalReporter) -> bool:
+    session = getattr(reporter, "_session", None)
+
+    return getattr(session, "exitstatus", None) == pytest.ExitCode.INTERRUPTED
+
+
 def pytest_unconfigure(config: Config) -> None:
     if config.option.help:
         return
 
+    checkpointer: Optional[NdjsonExporter] = config.pluginmanager.get_plugin(CHECKPOINT_PLUGIN_NAME)
+    if checkpointer is not None:
+        checkpointer.close()
+        _restore_sigterm_handler()
+
+    start_notifier: Optional[SessionStartNotifier] = config.pluginmanager.get_plugin(
+        SESSION_START_NOTIFIER_PLUGIN_NAME
+    )
+    if start_notifier is not None:
+        reporter = config.pluginmanager.get_plugin("terminalreporter")
+        start_notifier.join(
+            reporter.write_line if reporter is not None else print, timeout=PARTIAL_SEND_TIMEOUT
+        )
+
+    status = _notify_results(config)
+
+    if checkpointer is not None and status != NotifyStatus.UNSENT:
+        # results that failed to be sent remain in the checkpoint to be posted by
+        # 'pytest-discord flush', while deliberately suppressed ones are not posted later
+        try:
+            os.remove(checkpointer.path)
+        except OSError:
+            pass
+
+
+def _notify_results(config: Config) -> NotifyStatus:
+    render_start = time.perf_counter()
     opt_retriever = DiscordOptRetriever(config)
     url = opt_retriever.retrieve_webhook_url()
-    if not url:
-        return
+    digest_dir = opt_retriever.retrieve_digest_dir()
+    dry_run_dir = opt_retriever.retrieve_dry_run_dir()
+    if not url and not digest_dir and not dry_run_dir:
+        return NotifyStatus.UNSENT
 
     verbosity_level = opt_retriever.retrieve_verbosity_level()
     reporter = config.pluginmanager.get_plugin("terminalreporter")
     if reporter is None:
-        return
+        return NotifyStatus.UNSENT
 
-    md_report = _make_md_report(config, reporter)
+    notifier = None
+    if opt_retriever.retrieve_persistent() and not dry_run_dir:
+        notifier = get_persistent_notifier()
+
+    # a dry run writes the payload of the session without touching the digest store
+    if digest_dir and not dry_run_dir:
+        _accumulate_digest(opt_retriever, reporter, url, digest_dir, notifier)
+        return NotifyStatus.DELIVERED
+
+    is_partial = _is_interrupted(reporter)
 
     try:
+        start_datetime = datetime.fromtimestamp(reporter._sessionstarttime)
         duration = time.time() - reporter._sessionstarttime
     except AttributeError:
-        return
+        return NotifyStatus.UNSENT
 
     message, stat_count_map = _make_results_message(reporter)
+    header = _make_header(sum(stat_count_map.values()))
+    if is_partial:
+        header = f"[partial] {header}"
+
+    outcome = (
+        extract_result_type(stat_count_map),
+        is_partial,
+        tuple(sorted(nodeid for nodeid, _ in _extract_failure_signatures(reporter))),
+    )
+    if notifier is not None and url and not notifier.is_outcome_changed(url, outcome):
+        reporter.write_line(
+            "pytest-discord: skip a notification: the outcome is the same as the previous session"
+        )
+        return NotifyStatus.SUPPRESSED
+
+    # attachments are generated on worker threads while building embeds
+    attachment_builder = AttachmentBuilder()
+    md_future = None
+
+    if opt_retriever.retrieve_attach_file():
+        md_future = attachment_builder.submit(
+            lambda: _make_md_attachment(config, reporter, header, start_datetime),
+            priority=AttachmentPriority.MARKDOWN,
+        )
+
+    xml_path = _get_junitxml_path(config)
+    if xml_path and opt_retriever.retrieve_attach_junitxml():
+        attachment_builder.submit(
+            lambda: make_junitxml_attachment(
+                xml_path, start_datetime.strftime("pytest_%Y-%m-%dT%H:%M:%S.xml")
+            ),
+            priority=AttachmentPriority.JUNITXML,
+        )
+
+    if opt_retriever.retrieve_attach_logs():
+        failed_reports = [
+            report
+            for stat_key in ["failed", "error"]
+            for report in reporter.stats.get(stat_key, [])
+        ]
+        attachment_builder.submit(
+            lambda: make_logs_attachment(
+                failed_reports, start_datetime.strftime("pytest_%Y-%m-%dT%H:%M:%S_logs.zip")
+            ),
+            priority=AttachmentPriority.LOGS,
+        )
+
+    exporter: Optional[NdjsonExporter] = config.pluginmanager.get_plugin(EXPORTER_PLUGIN_NAME)
+    if exporter is not None and opt_retriever.retrieve_attach_export():
+        exporter.close()
+        attachment_builder.submit(
+            lambda: Attachment(
+                start_datetime.strftime("pytest_%Y-%m-%dT%H:%M:%S.ndjson.gz"),
+                exporter.compress(),
+            ),
+            priority=AttachmentPriority.EXPORT,
+        )
 
     if sum(stat_count_map[name] for name in ["failed", "error"]):
         avatar_url = opt_retriever.retrieve_fail_icon()
-        colour = Colour.red()
+        colour = Colour.RED
     elif (
         sum(stat_count_map[name] for name in ("skipped", "xfailed", "xpassed"))
         and stat_count_map["passed"] == 0
     ):
         avatar_url = opt_retriever.retrieve_skip_icon()
-        colour = Colour.gold()
+        colour = Colour.GOLD
     else:
         avatar_url = opt_retriever.retrieve_success_icon()
-        colour = Colour.green()
+        colour = Colour.GREEN
 
     embeds: List[Embed] = []
     embeds_len_ct = 0
     exceeds_embeds_limit = False
 
-    embed_summary = Embed(description=f"{message} in {duration:.1f} seconds", colour=colour)
+    embed_summary = Embed(
+        description="{} in {:.1f} seconds{}".format(
+            message, duration, " (interrupted)" if is_partial else ""
+        ),
+        colour=colour,
+    )
     embed_summary.set_footer(text=_make_summary_footer(reporter, verbosity_level))
     embeds.append(embed_summary)
-    assert embed_summary.description is not None
-    assert embed_summary.footer.text is not None
-    embeds_len_ct += len(embed_summary.description) + len(embed_summary.footer.text)
+    embeds_len_ct += len(embed_summary.description) + len(embed_summary.footer_text or "")
+
+    duration_recorder: Optional[DurationRecorder] = config.pluginmanager.get_plugin(
+        DURATION_RECORDER_PLUGIN_NAME
+    )
+    if (
+        duration_recorder is not None
+        and duration_recorder.regressions
+        and opt_retriever.retrieve_duration_regression()
+    ):
+        embed = _make_duration_regressions_embed(duration_recorder.regressions)
+        embeds.append(embed)
+        embeds_len_ct += len(embed.description)
+
+    resource_sampler: Optional[ResourceSampler] = config.pluginmanager.get_plugin(
+        RESOURCE_SAMPLER_PLUGIN_NAME
+    )
+    resource_embed = (
+        _make_resource_usage_embed(resource_sampler) if resource_sampler is not None else None
+    )
+    if resource_embed is not None:
+        embeds.append(resource_embed)
+        embeds_len_ct += len(resource_embed.description)
 
     if verbosity_level >= 1:
         pytest_stats = extract_pytest_stats(
@@ -384,7 +1061,6 @@ def pytest_unconfigure(config: Config) -> None:
                 colour=_result_type_to_colour[result_type],
             )
             embeds.append(embed)
-            assert embed.description is not None
             embeds_len_ct += len(embed.description)
 
         _embeds, exceeds_embeds_limit = _extract_longrepr_embeds(
@@ -392,58 +1068,319 @@ def pytest_unconfigure(config: Config) -> None:
         )
         embeds.extend(_embeds)
 
-    header = _make_header(sum(stat_count_map.values()))
-    attach_file = None
-
-    if opt_retriever.retrieve_attach_file() or exceeds_embeds_limit:
-        attach_file = File(
-            io.BytesIO(
-                "# {}\n{}\n\n{}".format(
-                    header, md_report, "\n\n".join(_extract_longrepr(reporter))
-                ).encode("utf8")
-            ),
-            datetime.fromtimestamp(reporter._sessionstarttime).strftime(
-                "pytest_%Y-%m-%dT%H:%M:%S.md"
-            ),
+    if md_future is None and exceeds_embeds_limit:
+        md_future = attachment_builder.submit(
+            lambda: _make_md_attachment(config, reporter, header, start_datetime),
+            priority=AttachmentPriority.MARKDOWN,
         )
 
-    asyncio.run(
-        _send_message(
-            reporter=reporter,
+    attachments, dropped_attachments = pack_attachments(attachment_builder.results())
+    for error in attachment_builder.errors:
+        reporter.write_line(f"pytest-discord: skip attaching a file: {error}")
+    for attachment in dropped_attachments:
+        reporter.write_line(
+            f"pytest-discord: skip attaching {attachment.filename}: exceeds the attachment limits"
+        )
+
+    md_attachment = md_future.result() if md_future else None
+
+    owner_messages = _make_owner_messages(opt_retriever, reporter, header, notifier)
+
+    dedup_mode = opt_retriever.retrieve_dedup_mode()
+    dedup_cache = None
+    dedup_key = ""
+
+    if dedup_mode is not None:
+        dedup_cache = DedupCache(
+            opt_retriever.retrieve_dedup_dir() or _get_cache_dir(config, "dedup"),
+            ttl=opt_retriever.retrieve_dedup_ttl(),
+        )
+        dedup_key = make_dedup_key(
+            url or "",
+            stat_count_map,
+            _extract_failure_signatures(reporter),
+            attachments=[md_attachment.data] if md_attachment else [],
+        )
+        posted_at = dedup_cache.lookup(dedup_key)
+
+        if posted_at is not None:
+            if dedup_mode == DedupMode.SKIP:
+                reporter.write_line(
+                    "pytest-discord: skip a notification identical to the previous run"
+                )
+                return NotifyStatus.SUPPRESSED
+
+            header = "{}\nsame as the previous run at {}".format(
+                header, datetime.fromtimestamp(posted_at).strftime("%Y-%m-%d %H:%M:%S")
+            )
+            embeds = [embed_summary]
+            attachments = []
+            dedup_cache = None
+            owner_messages = []
+
+    if dry_run_dir:
+        _write_dry_run(
+            reporter.write_line,
+            dry_run_dir,
+            header=header,
+            username=opt_retriever.retrieve_username(),
+            avatar_url=avatar_url,
+            embeds=embeds,
+            attachments=attachments,
+            owner_messages=owner_messages,
+            elapsed=time.perf_counter() - render_start,
+        )
+        return NotifyStatus.SUPPRESSED
+
+    assert url
+
+    async def send(session: Optional[aiohttp.ClientSession]) -> bool:
+        send_coro = _send_message(
+            write_line=reporter.write_line,
             url=url,
             header=header,
             username=opt_retriever.retrieve_username(),
             avatar_url=avatar_url,
             embeds=embeds,
-            attach_file=attach_file,
+            attachments=attachments,
+            backend=opt_retriever.retrieve_backend(),
+            owner_messages=owner_messages,
+            session=session,
+        )
+        if is_partial:
+            return await asyncio.wait_for(send_coro, timeout=PARTIAL_SEND_TIMEOUT)
+
+        return await send_coro
+
+    try:
+        is_sent = _run_send(notifier, send)
+    except asyncio.TimeoutError:
+        reporter.write_line(
+            f"pytest-discord error: sending partial results timed out ({PARTIAL_SEND_TIMEOUT} sec)"
         )
+        return NotifyStatus.UNSENT
+
+    if is_sent and dedup_cache is not None:
+        dedup_cache.store(dedup_key)
+    if is_sent and notifier is not None:
+        notifier.store_outcome(url, outcome)
+
+    return NotifyStatus.DELIVERED if is_sent else NotifyStatus.UNSENT
+
+
+def _write_dry_run(
+    write_line: Callable[[str], None],
+    out_dir: str,
+    header: str,
+    username: str,
+    avatar_url: Optional[str],
+    embeds: Sequence[Embed],
+    attachments: Sequence[Attachment],
+    owner_messages: Sequence[OwnerMessage],
+    elapsed: float,
+) -> None:
+    payload = make_payload(
+        header,
+        username=username,
+        avatar_url=avatar_url,
+        embeds=embeds,
+        filenames=[attachment.filename for attachment in attachments],
     )
+    # webhook urls of owners are not written since they contain tokens
+    owner_payloads = [
+        {
+            "owner": owner_message.owner,
+            "payload": make_payload(
+                owner_message.header,
+                username=username,
+                avatar_url=avatar_url,
+                embeds=owner_message.embeds,
+            ),
+        }
+        for owner_message in owner_messages
+    ]
 
+    try:
+        size = write_dry_run(out_dir, payload, attachments, owner_payloads)
+    except OSError as e:
+        write_line(f"pytest-discord error: {str(e)}")
+        return
 
-async def _send_message(
+    write_line(
+        "pytest-discord: wrote a payload and {} attachments to {} "
+        "({} bytes, rendered in {:.1f} ms)".format(len(attachments), out_dir, size, elapsed * 1000)
+    )
+
+
+def _run_send(
+    notifier: Optional[PersistentNotifier],
+    send: Callable[[Optional[aiohttp.ClientSession]], Coroutine[None, None, T]],
+) -> T:
+    if notifier is None:
+        return asyncio.run(send(None))
+
+    return notifier.run(send)
+
+
+def _accumulate_digest(
+    opt_retriever: DiscordOptRetriever,
     reporter: TerminalReporter,
+    url: Optional[str],
+    digest_dir: str,
+    notifier: Optional[PersistentNotifier] = None,
+) -> None:
+    _, stat_count_map = _make_results_message(reporter)
+    store = DigestStore(digest_dir)
+
+    # the lock is held until the rotation, so overlapping runs neither lose results
+    # nor post the same window twice
+    with store.lock():
+        store.append(
+            stat_count_map,
+            dict.fromkeys(nodeid for nodeid, _ in _extract_failure_signatures(reporter)),
+        )
+
+        if not url or not store.is_window_expired(opt_retriever.retrieve_digest_window()):
+            return
+
+        digest = store.make_digest()
+        header, embed = make_digest_message(digest, max_len=MAX_EMBED_LEN)
+        is_sent = _run_send(
+            notifier,
+            lambda session: _send_message(
+                write_line=reporter.write_line,
+                url=url,
+                header=header,
+                username=opt_retriever.retrieve_username(),
+                avatar_url=None,
+                embeds=[embed],
+                backend=opt_retriever.retrieve_backend(),
+                session=session,
+            ),
+        )
+
+        if is_sent:
+            store.rotate(digest)
+
+
+async def _send_message(
+    write_line: Callable[[str], None],
     url: str,
     header: str,
     username: str,
     avatar_url: Optional[str],
     embeds: Sequence[Embed],
-    attach_file: Optional[File] = None,
-) -> None:
-    if attach_file:
-        afile = attach_file
-    else:
-        afile = MISSING
+    attachments: Sequence[Attachment] = (),
+    backend: WebhookBackend = WebhookBackend.BUILTIN,
+    owner_messages: Sequence[OwnerMessage] = (),
+    session: Optional[aiohttp.ClientSession] = None,
+) -> bool:
+    files = [(attachment.filename, io.BytesIO(attachment.data)) for attachment in attachments]
+
+    # messages to owners are sent concurrently with the message, sharing a connection pool
+    async with _open_session(session) as session:
+        results = await asyncio.gather(
+            _post_message(
+                write_line, session, url, header, username, avatar_url, embeds, files, backend
+            ),
+            *[
+                _post_message(
+                    write_line,
+                    session,
+                    owner_message.url,
+                    owner_message.header,
+                    username,
+                    avatar_url,
+                    owner_message.embeds,
+                    [],
+                    backend,
+                )
+                for owner_message in owner_messages
+            ],
+        )
+
+    return results[0]
+
+
+@asynccontextmanager
+async def _open_session(
+    session: Optional[aiohttp.ClientSession],
+) -> AsyncIterator[aiohttp.ClientSession]:
+    if session is not None:
+        # a session given by a persistent notifier outlives a message
+        yield session
+        return
 
     async with aiohttp.ClientSession() as session:
-        try:
-            webhook = Webhook.from_url(url, session=session)
-        except (TypeError, ValueError, HTTPException, NotFound, Forbidden) as e:
-            reporter.write_line(f"pytest-discord error: {str(e)}")
-            return
+        yield session
+
+
+async def _post_message(
+    write_line: Callable[[str], None],
+    session: aiohttp.ClientSession,
+    url: str,
+    header: str,
+    username: str,
+    avatar_url: Optional[str],
+    embeds: Sequence[Embed],
+    files: Sequence[WebhookFile],
+    backend: WebhookBackend,
+) -> bool:
+    if backend == WebhookBackend.DISCORD_PY:
+        return await _send_discord_py_message(
+            write_line, session, url, header, username, avatar_url, embeds, files
+        )
 
+    try:
+        webhook = WebhookClient(url, session=session)
+        await webhook.send(
+            header, username=username, avatar_url=avatar_url, embeds=embeds, files=files
+        )
+    except (ValueError, WebhookError, aiohttp.ClientError) as e:
+        write_line(f"pytest-discord error: {str(e)}")
+        return False
+
+    return True
+
+
+async def _send_discord_py_message(
+    write_line: Callable[[str], None],
+    session: aiohttp.ClientSession,
+    url: str,
+    header: str,
+    username: str,
+    avatar_url: Optional[str],
+    embeds: Sequence[Embed],
+    files: Sequence[WebhookFile],
+) -> bool:
+    try:
+        from discord import Webhook
+        from discord.errors import Forbidden, HTTPException, NotFound
+        from discord.utils import MISSING
+    except ImportError:
+        write_line("pytest-discord error: discord.py backend requires discord.py package")
+        return False
+
+    try:
+        webhook = Webhook.from_url(url, session=session)
+    except (TypeError, ValueError, HTTPException, NotFound, Forbidden) as e:
+        write_line(f"pytest-discord error: {str(e)}")
+        return False
+
+    dpy_embeds, dpy_files = to_discord_py_args(embeds, files)
+    try:
         await webhook.send(
-            header, username=username, avatar_url=avatar_url, embeds=embeds, file=afile
+            header,
+            username=username,
+            avatar_url=avatar_url,
+            embeds=dpy_embeds,
+            files=dpy_files if dpy_files else MISSING,
         )
+    except (HTTPException, aiohttp.ClientError) as e:
+        write_line(f"pytest-discord error: {str(e)}")
+        return False
+
+    return True
 
 
 @pytest.hookimpl()
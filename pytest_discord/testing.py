@@ -0,0 +1,414 @@
+"""
+Testing utilities: an in-process fake Discord webhook server and a load-test harness.
+
+Enable the ``discord_webhook_server`` fixture in a ``conftest.py``:
+
+    pytest_plugins = ["pytest_discord.testing"]
+"""
+
+import asyncio
+import json
+import math
+import re
+import socket
+import threading
+import time
+from typing import Any, Dict, Generator, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import unquote
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from ._webhook import Embed, WebhookClient, WebhookError
+
+
+MAX_CONTENT_LEN = 2000
+MAX_EMBED_CT = 10
+MAX_EMBED_DESCRIPTION_LEN = 4096
+MAX_EMBED_FOOTER_LEN = 2048
+MAX_EMBEDS_LEN = 6000
+MAX_FILE_CT = 10
+MAX_FILES_SIZE = 10 * 1024 * 1024
+
+DEFAULT_RATE_LIMIT = 5
+DEFAULT_RATE_LIMIT_PER = 2.0
+
+_WEBHOOK_ID_BASE = 100000000000000000
+_WEBHOOK_TOKEN = "x" * 68
+
+_re_file_field = re.compile(r"^files\[(\d+)\]$")
+
+
+class ReceivedMessage(NamedTuple):
+    webhook_id: str
+    token: str
+    payload: Dict[str, Any]
+    files: Dict[str, bytes]
+    received_at: float
+    thread_id: Optional[str] = None
+
+
+class _RateLimitBucket:
+    __slots__ = ("remaining", "reset_at")
+
+    def __init__(self, limit: int, reset_at: float) -> None:
+        self.remaining = limit
+        self.reset_at = reset_at
+
+
+def validate_payload(
+    payload: Dict[str, Any], files: Dict[str, bytes], max_files_size: int = MAX_FILES_SIZE
+) -> List[str]:
+    """
+    Validate a webhook payload against the Discord limits.
+
+    Returns:
+        Descriptions of violated limits. Empty if the payload is valid.
+    """
+
+    errors = []
+    content = payload.get("content") or ""
+    embeds = payload.get("embeds") or []
+
+    if not content and not embeds and not files:
+        errors.append("cannot send an empty message")
+
+    if len(content) > MAX_CONTENT_LEN:
+        errors.append(f"content: must be {MAX_CONTENT_LEN} or fewer in length")
+
+    if len(embeds) > MAX_EMBED_CT:
+        errors.append(f"embeds: must be {MAX_EMBED_CT} or fewer in length")
+
+    embeds_len = 0
+    for i, embed in enumerate(embeds):
+        description = embed.get("description") or ""
+        footer_text = (embed.get("footer") or {}).get("text") or ""
+
+        if len(description) > MAX_EMBED_DESCRIPTION_LEN:
+            errors.append(
+                f"embeds.{i}.description: must be {MAX_EMBED_DESCRIPTION_LEN} or fewer in length"
+            )
+        if len(footer_text) > MAX_EMBED_FOOTER_LEN:
+            errors.append(
+                f"embeds.{i}.footer.text: must be {MAX_EMBED_FOOTER_LEN} or fewer in length"
+            )
+
+        embeds_len += len(description) + len(footer_text)
+
+    if embeds_len > MAX_EMBEDS_LEN:
+        errors.append(f"embeds: total size must be {MAX_EMBEDS_LEN} or fewer in length")
+
+    if len(files) > MAX_FILE_CT:
+        errors.append(f"files: must be {MAX_FILE_CT} or fewer in length")
+
+    if sum(len(data) for data in files.values()) > max_files_size:
+        errors.append("files: request entity too large")
+
+    return errors
+
+
+class FakeDiscordServer:
+    """
+    A local aiohttp server that behaves like the Discord webhook endpoint.
+    The server runs an event loop on a background thread, validates payloads against
+    the Discord limits, emulates per-webhook rate limits, and records received messages.
+    """
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.__host}:{self.__port}"
+
+    @property
+    def messages(self) -> List[ReceivedMessage]:
+        with self.__lock:
+            return list(self.__messages)
+
+    @property
+    def rejected_count(self) -> int:
+        return self.__rejected_count
+
+    @property
+    def rate_limited_count(self) -> int:
+        return self.__rate_limited_count
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        rate_limit: int = DEFAULT_RATE_LIMIT,
+        rate_limit_per: float = DEFAULT_RATE_LIMIT_PER,
+        max_files_size: int = MAX_FILES_SIZE,
+    ) -> None:
+        self.__host = host
+        self.__port = 0
+        self.__rate_limit = rate_limit
+        self.__rate_limit_per = rate_limit_per
+        self.__max_files_size = max_files_size
+
+        self.__lock = threading.Lock()
+        self.__messages: List[ReceivedMessage] = []
+        self.__buckets: Dict[str, _RateLimitBucket] = {}
+        self.__rejected_count = 0
+        self.__rate_limited_count = 0
+
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__thread: Optional[threading.Thread] = None
+        self.__runner: Optional[web.AppRunner] = None
+
+    def __enter__(self) -> "FakeDiscordServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def make_webhook_url(
+        self, webhook_id: int = _WEBHOOK_ID_BASE, token: str = _WEBHOOK_TOKEN
+    ) -> str:
+        return f"{self.base_url}/api/webhooks/{webhook_id}/{token}"
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__messages.clear()
+            self.__buckets.clear()
+            self.__rejected_count = 0
+            self.__rate_limited_count = 0
+
+    def start(self) -> None:
+        if self.__thread is not None:
+            return
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.__host, 0))
+        self.__port = sock.getsockname()[1]
+
+        self.__loop = asyncio.new_event_loop()
+        self.__thread = threading.Thread(
+            target=self.__loop.run_forever, name="fake-discord-server", daemon=True
+        )
+        self.__thread.start()
+
+        asyncio.run_coroutine_threadsafe(self.__start_site(sock), self.__loop).result()
+
+    def stop(self) -> None:
+        if self.__thread is None or self.__loop is None:
+            return
+
+        if self.__runner is not None:
+            asyncio.run_coroutine_threadsafe(self.__runner.cleanup(), self.__loop).result()
+            self.__runner = None
+
+        self.__loop.call_soon_threadsafe(self.__loop.stop)
+        self.__thread.join()
+        self.__loop.close()
+        self.__thread = None
+        self.__loop = None
+
+    async def __start_site(self, sock: socket.socket) -> None:
+        app = web.Application(client_max_size=self.__max_files_size * 2)
+        app.router.add_post("/api/webhooks/{webhook_id}/{token}", self.__handle)
+        app.router.add_post("/api/v{version:\\d+}/webhooks/{webhook_id}/{token}", self.__handle)
+
+        self.__runner = web.AppRunner(app)
+        await self.__runner.setup()
+        await web.SockSite(self.__runner, sock).start()
+
+    async def __handle(self, request: web.Request) -> web.Response:
+        webhook_id = request.match_info["webhook_id"]
+        token = request.match_info["token"]
+        headers, retry_after = self.__consume_rate_limit(webhook_id)
+
+        if retry_after is not None:
+            with self.__lock:
+                self.__rate_limited_count += 1
+
+            return web.json_response(
+                {
+                    "message": "You are being rate limited.",
+                    "retry_after": retry_after,
+                    "global": False,
+                },
+                status=429,
+                headers=dict(headers, **{"Retry-After": str(math.ceil(retry_after))}),
+            )
+
+        try:
+            payload, files = await self.__parse_body(request)
+        except ValueError as e:
+            return self.__reject(headers, [str(e)])
+
+        errors = validate_payload(payload, files, max_files_size=self.__max_files_size)
+        if errors:
+            return self.__reject(headers, errors)
+
+        with self.__lock:
+            self.__messages.append(
+                ReceivedMessage(
+                    webhook_id,
+                    token,
+                    payload,
+                    files,
+                    received_at=time.time(),
+                    thread_id=request.query.get("thread_id"),
+                )
+            )
+
+        if request.query.get("wait") == "true":
+            return web.json_response(dict(payload, id=str(len(self.__messages))), headers=headers)
+
+        return web.Response(status=204, headers=headers)
+
+    def __reject(self, headers: Dict[str, str], errors: Sequence[str]) -> web.Response:
+        with self.__lock:
+            self.__rejected_count += 1
+
+        return web.json_response(
+            {"code": 50035, "message": "Invalid Form Body", "errors": list(errors)},
+            status=400,
+            headers=headers,
+        )
+
+    def __consume_rate_limit(self, webhook_id: str) -> Tuple[Dict[str, str], Optional[float]]:
+        now = time.time()
+
+        with self.__lock:
+            bucket = self.__buckets.get(webhook_id)
+            if bucket is None or bucket.reset_at <= now:
+                bucket = _RateLimitBucket(self.__rate_limit, now + self.__rate_limit_per)
+                self.__buckets[webhook_id] = bucket
+
+            reset_after = bucket.reset_at - now
+            retry_after = None
+            if bucket.remaining > 0:
+                bucket.remaining -= 1
+            else:
+                retry_after = reset_after
+
+            headers = {
+                "X-RateLimit-Bucket": webhook_id,
+                "X-RateLimit-Limit": str(self.__rate_limit),
+                "X-RateLimit-Remaining": str(bucket.remaining),
+                "X-RateLimit-Reset": f"{bucket.reset_at:.3f}",
+                "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+            }
+
+        return (headers, retry_after)
+
+    @staticmethod
+    async def __parse_body(request: web.Request) -> Tuple[Dict[str, Any], Dict[str, bytes]]:
+        if request.content_type == "application/json":
+            try:
+                return (await request.json(), {})
+            except ValueError:
+                raise ValueError("payload: invalid JSON")
+
+        if request.content_type != "multipart/form-data":
+            raise ValueError(f"unsupported content type: {request.content_type}")
+
+        payload: Dict[str, Any] = {}
+        uploads: Dict[int, Tuple[str, bytes]] = {}
+        reader = await request.multipart()
+
+        while True:
+            part = await reader.next()
+            if part is None:
+                break
+
+            if not isinstance(part, aiohttp.BodyPartReader):
+                continue
+
+            if part.name == "payload_json":
+                try:
+                    payload = json.loads(await part.text())
+                except ValueError:
+                    raise ValueError("payload_json: invalid JSON")
+                continue
+
+            m = _re_file_field.match(part.name or "")
+            if m:
+                uploads[int(m.group(1))] = (unquote(part.filename or ""), bytes(await part.read()))
+
+        # uploaded files are associated with attachments of a payload by indexes of fields
+        files: Dict[str, bytes] = {}
+        for attachment in payload.get("attachments") or []:
+            upload = uploads.pop(attachment.get("id"), None)
+            if upload is None:
+                raise ValueError(f"attachments: no uploaded file for id {attachment.get('id')}")
+
+            files[attachment.get("filename") or upload[0]] = upload[1]
+
+        for filename, data in uploads.values():
+            files[filename] = data
+
+        return (payload, files)
+
+
+class LoadTestResult(NamedTuple):
+    sent: int
+    failed: int
+    elapsed: float
+    latencies: List[float]
+
+    @property
+    def throughput(self) -> float:
+        if self.elapsed <= 0:
+            return 0.0
+
+        return self.sent / self.elapsed
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, math.ceil(q / 100 * len(latencies)) - 1)]
+
+
+async def run_load_test(
+    server: FakeDiscordServer,
+    sessions: int = 200,
+    messages_per_session: int = 1,
+    embed_len: int = 1024,
+) -> LoadTestResult:
+    """
+    Drive concurrent simulated sessions against a fake server with the built-in webhook client.
+    Each session has its own connection pool and webhook, like separate pytest processes.
+    Latencies include waits for rate limits.
+    """
+
+    latencies: List[float] = []
+    failures: List[Exception] = []
+    embeds = [Embed(description="x" * embed_len, colour=0)]
+
+    async def run_session(i: int) -> None:
+        url = server.make_webhook_url(webhook_id=_WEBHOOK_ID_BASE + i)
+
+        async with aiohttp.ClientSession() as session:
+            webhook = WebhookClient(url, session=session)
+
+            for j in range(messages_per_session):
+                start = time.perf_counter()
+                try:
+                    await webhook.send(f"session {i}: message {j}", embeds=embeds)
+                except (WebhookError, aiohttp.ClientError) as e:
+                    failures.append(e)
+                    continue
+
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[run_session(i) for i in range(sessions)])
+
+    return LoadTestResult(
+        sent=len(latencies),
+        failed=len(failures),
+        elapsed=time.perf_counter() - start,
+        latencies=latencies,
+    )
+
+
+@pytest.fixture
+def discord_webhook_server() -> Generator[FakeDiscordServer, None, None]:
+    with FakeDiscordServer() as server:
+        yield server
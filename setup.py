@@ -54,7 +54,7 @@ setuptools.setup(
     },
     python_requires=">=3.8",
     install_requires=INSTALL_REQUIRES,
-    extras_require={"test": TESTS_REQUIRES},
+    extras_require={"discord": ["discord.py>=2,<3"], "test": TESTS_REQUIRES},
     classifiers=[
         "Development Status :: 4 - Beta",
         "Environment :: Plugins",
@@ -77,5 +77,8 @@ setuptools.setup(
     ],
     cmdclass=get_release_command_class(),
     zip_safe=False,
-    entry_points={"pytest11": ["pytest-discord = pytest_discord.plugin"]},
+    entry_points={
+        "console_scripts": ["pytest-discord = pytest_discord.__main__:main"],
+        "pytest11": ["pytest-discord = pytest_discord.plugin"],
+    },
 )
@@ -1,15 +1,28 @@
+import asyncio
+import gzip
+import json
 import re
 import sys
+import threading
+import zipfile
 from textwrap import dedent
 from unittest import mock
 
+import aiohttp
 import pytest
-from discord import Colour
+from pytest_discord.__main__ import main
+from pytest_discord._attachment import Attachment, compress_attachment
+from pytest_discord._baseline import DurationBaseline, estimate_duration
+from pytest_discord._digest import DigestStore
+from pytest_discord._owners import OwnersMatcher
+from pytest_discord._webhook import Colour, Embed, WebhookClient, WebhookError
+from pytest_discord.testing import FakeDiscordServer, run_load_test
 
 
 DUMMY_WEBHOOK_URL = "https://discordapp.com/api/webhooks/111111111111111111/abcABC111111111111111111111111111111111111111111111111111111111111-"
 SUCCESS_ICON_URL = "https://success.png"
 FAILED_ICON_URL = "https://fail.png"
+WEBHOOK_SEND = "pytest_discord._webhook.WebhookClient.send"
 
 PYCODE_PASS = dedent(
     """\
@@ -29,7 +42,7 @@ class AsyncMock(mock.MagicMock):
 def test_pytest_discord_passed(testdir):
     testdir.makepyfile(PYCODE_PASS)
 
-    with mock.patch("discord.Webhook.send", new_callable=AsyncMock) as mock_send:
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
         testdir.runpytest("--discord-webhook", DUMMY_WEBHOOK_URL)
 
         args = mock_send.call_args[1]
@@ -37,7 +50,7 @@ def test_pytest_discord_passed(testdir):
         assert not args["avatar_url"]
 
         embed = args["embeds"][0]
-        assert embed.colour == Colour.green()
+        assert embed.colour == Colour.GREEN
         assert re.search(r"1 passed in [0-9\.]+ seconds", embed.description)
 
 
@@ -53,7 +66,7 @@ def test_pytest_discord_skipped(testdir):
         )
     )
 
-    with mock.patch("discord.Webhook.send", new_callable=AsyncMock) as mock_send:
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
         testdir.runpytest("--discord-webhook", DUMMY_WEBHOOK_URL)
 
         args = mock_send.call_args[1]
@@ -61,7 +74,7 @@ def test_pytest_discord_skipped(testdir):
         assert not args["avatar_url"]
 
         embed = args["embeds"][0]
-        assert embed.colour == Colour.gold()
+        assert embed.colour == Colour.GOLD
         assert re.search(r"1 skipped in [0-9\.]+ seconds", embed.description)
 
 
@@ -94,7 +107,7 @@ def test_pytest_discord_failed(testdir):
         )
     )
 
-    with mock.patch("discord.Webhook.send", new_callable=AsyncMock) as mock_send:
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
         testdir.runpytest("--discord-webhook", DUMMY_WEBHOOK_URL)
 
         args = mock_send.call_args[1]
@@ -103,7 +116,7 @@ def test_pytest_discord_failed(testdir):
         assert not args["avatar_url"]
 
         embed = args["embeds"][0]
-        assert embed.colour == Colour.red()
+        assert embed.colour == Colour.RED
         assert re.search(
             r"1 failed, 1 passed, 1 skipped, 1 errors, 1 xfailed, 1 xpassed in [0-9\.]+ seconds",
             embed.description,
@@ -120,7 +133,7 @@ def test_pytest_discord_failed(testdir):
 def test_pytest_discord_username(testdir, value, expected):
     testdir.makepyfile(PYCODE_PASS)
 
-    with mock.patch("discord.Webhook.send", new_callable=AsyncMock) as mock_send:
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
         testdir.runpytest("--discord-webhook", DUMMY_WEBHOOK_URL, "--discord-username", value)
 
         args = mock_send.call_args[1]
@@ -143,7 +156,7 @@ def test_pytest_discord_avatar_url(testdir, value, expected):
         """.format(value)
     )
 
-    with mock.patch("discord.Webhook.send", new_callable=AsyncMock) as mock_send:
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
         testdir.runpytest(
             "--discord-webhook",
             DUMMY_WEBHOOK_URL,
@@ -158,6 +171,35 @@ def test_pytest_discord_avatar_url(testdir, value, expected):
         assert args["avatar_url"] == expected
 
 
+def test_pytest_discord_discord_py_backend(testdir):
+    discord = pytest.importorskip("discord")
+    testdir.makepyfile(PYCODE_PASS)
+
+    with mock.patch("discord.Webhook.send", new_callable=AsyncMock) as mock_send:
+        testdir.runpytest("--discord-webhook", DUMMY_WEBHOOK_URL, "--discord-backend", "discord.py")
+
+        args = mock_send.call_args[1]
+
+        embed = args["embeds"][0]
+        assert isinstance(embed, discord.Embed)
+        assert embed.colour == discord.Colour.green()
+        assert re.search(r"1 passed in [0-9\.]+ seconds", embed.description)
+
+
+def test_pytest_discord_discord_py_backend_http_error(testdir):
+    discord = pytest.importorskip("discord")
+    testdir.makepyfile(PYCODE_PASS)
+
+    error = discord.NotFound(mock.Mock(status=404, reason="Not Found"), "Unknown Webhook")
+    with mock.patch("discord.Webhook.send", new_callable=AsyncMock, side_effect=error):
+        result = testdir.runpytest(
+            "--discord-webhook", DUMMY_WEBHOOK_URL, "--discord-backend", "discord.py"
+        )
+
+    result.stdout.fnmatch_lines(["pytest-discord error: 404 Not Found*Unknown Webhook"])
+    assert result.ret == 0
+
+
 @pytest.mark.parametrize(
     ["value", "expected"],
     [("invalid-webhook-url", "pytest-discord error: Invalid webhook URL given.")],
@@ -169,3 +211,868 @@ def test_pytest_discord_invalid_webhoook(testdir, value, expected):
     result.assert_outcomes(passed=1)
     assert result.outlines[-1] == expected
     assert result.errlines == []
+
+
+def test_pytest_discord_export(testdir):
+    testdir.makepyfile(
+        dedent(
+            """\
+            import pytest
+
+            def test_pass():
+                assert True
+
+            def test_failed():
+                assert False, "failure reason"
+
+            def test_skipped():
+                pytest.skip()
+            """
+        )
+    )
+    export_path = testdir.tmpdir.join("results.ndjson")
+
+    result = testdir.runpytest("--discord-export", str(export_path))
+    result.assert_outcomes(passed=1, failed=1, skipped=1)
+
+    records = [json.loads(line) for line in export_path.read_text("utf8").splitlines()]
+    test_records = {record["nodeid"]: record for record in records if record["type"] == "test"}
+    summary = records[-1]
+
+    assert test_records["test_pytest_discord_export.py::test_pass"]["outcome"] == "passed"
+    assert test_records["test_pytest_discord_export.py::test_skipped"]["outcome"] == "skipped"
+    failed = test_records["test_pytest_discord_export.py::test_failed"]
+    assert failed["outcome"] == "failed"
+    assert failed["signature"] == "AssertionError: failure reason"
+    assert summary["type"] == "summary"
+    assert summary["outcomes"] == {"passed": 1, "failed": 1, "skipped": 1}
+    assert summary["tests"] == 3
+
+
+def test_pytest_discord_attach_export(testdir):
+    testdir.makepyfile(PYCODE_PASS)
+    export_path = testdir.tmpdir.join("results.ndjson")
+
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
+        testdir.runpytest(
+            "--discord-webhook",
+            DUMMY_WEBHOOK_URL,
+            "--discord-export",
+            str(export_path),
+            "--discord-attach-export",
+        )
+
+        args = mock_send.call_args[1]
+
+        ((filename, fp),) = args["files"]
+        assert filename.endswith(".ndjson.gz")
+        records = gzip.decompress(fp.getvalue()).decode("utf8").splitlines()
+        assert json.loads(records[-1])["outcomes"] == {"passed": 1}
+
+
+@pytest.mark.parametrize(["mode", "expected_call_count"], [("skip", 1), ("reference", 2)])
+def test_pytest_discord_dedup(testdir, mode, expected_call_count):
+    testdir.makepyfile(PYCODE_PASS)
+    dedup_dir = testdir.tmpdir.join("dedup")
+
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
+        for _ in range(2):
+            testdir.runpytest(
+                "--discord-webhook",
+                DUMMY_WEBHOOK_URL,
+                "--discord-dedup",
+                mode,
+                "--discord-dedup-dir",
+                str(dedup_dir),
+            )
+
+        assert mock_send.call_count == expected_call_count
+        assert len(dedup_dir.listdir()) == 1
+
+        if mode == "reference":
+            assert "same as the previous run at" in mock_send.call_args[0][0]
+
+
+def test_pytest_discord_dedup_per_webhook(testdir):
+    testdir.makepyfile(PYCODE_PASS)
+    dedup_dir = testdir.tmpdir.join("dedup")
+    other_webhook_url = DUMMY_WEBHOOK_URL.replace("111111111111111111", "222222222222222222", 1)
+
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
+        for webhook_url in [DUMMY_WEBHOOK_URL, other_webhook_url]:
+            testdir.runpytest(
+                "--discord-webhook",
+                webhook_url,
+                "--discord-dedup",
+                "skip",
+                "--discord-dedup-dir",
+                str(dedup_dir),
+            )
+
+        assert mock_send.call_count == 2
+        assert len(dedup_dir.listdir()) == 2
+
+
+def test_pytest_discord_digest(testdir):
+    testdir.makepyfile(
+        dedent(
+            """\
+            import os
+
+            def test_pass():
+                assert True
+
+            def test_flaky():
+                assert not os.environ.get("FAIL_FLAKY")
+            """
+        )
+    )
+    digest_dir = testdir.tmpdir.join("digest")
+
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
+        for fail_flaky in ["", "1"]:
+            testdir.monkeypatch.setenv("FAIL_FLAKY", fail_flaky)
+            testdir.runpytest(
+                "--discord-webhook",
+                DUMMY_WEBHOOK_URL,
+                "--discord-digest",
+                str(digest_dir),
+                "--discord-digest-window",
+                "3600",
+            )
+
+        assert mock_send.call_count == 0
+
+        assert main(["digest", str(digest_dir), "--webhook", DUMMY_WEBHOOK_URL]) == 0
+        assert mock_send.call_count == 1
+
+        args = mock_send.call_args[1]
+
+        assert mock_send.call_args[0][0].startswith("test digest: 2 runs")
+        embed = args["embeds"][0]
+        assert embed.colour == Colour.RED
+        assert "runs passed: 1/2 (50.0%)" in embed.description
+        assert (
+            "`test_pytest_discord_digest.py::test_flaky`: failed in 1/2 runs" in embed.description
+        )
+
+        assert main(["digest", str(digest_dir), "--webhook", DUMMY_WEBHOOK_URL]) == 0
+        assert mock_send.call_count == 1
+
+
+def test_pytest_discord_digest_window(testdir):
+    testdir.makepyfile(PYCODE_PASS)
+    digest_dir = testdir.tmpdir.join("digest")
+
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
+        testdir.runpytest(
+            "--discord-webhook",
+            DUMMY_WEBHOOK_URL,
+            "--discord-digest",
+            str(digest_dir),
+            "--discord-digest-window",
+            "0",
+        )
+
+        assert mock_send.call_count == 1
+        assert "runs passed: 1/1 (100.0%)" in mock_send.call_args[1]["embeds"][0].description
+
+
+def test_pytest_discord_interrupted(testdir):
+    testdir.makepyfile(
+        dedent(
+            """\
+            import pytest
+
+            def test_pass():
+                assert True
+
+            def test_interrupt():
+                pytest.exit("interrupted")
+
+            def test_not_executed():
+                assert True
+            """
+        )
+    )
+    checkpoint_path = testdir.tmpdir.join("checkpoint.ndjson")
+
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
+        testdir.runpytest(
+            "--discord-webhook", DUMMY_WEBHOOK_URL, "--discord-checkpoint", str(checkpoint_path)
+        )
+
+        assert mock_send.call_args[0][0].startswith("[partial] ")
+        embed = mock_send.call_args[1]["embeds"][0]
+        assert re.search(r"1 passed in [0-9\.]+ seconds \(interrupted\)", embed.description)
+        assert not checkpoint_path.exists()
+
+
+def test_pytest_discord_checkpoint_sigterm(testdir, discord_webhook_server):
+    testdir.makepyfile(
+        dedent(
+            """\
+            import os
+            import signal
+            import time
+
+            def test_pass():
+                assert True
+
+            def test_terminated():
+                os.kill(os.getpid(), signal.SIGTERM)
+                time.sleep(10)
+            """
+        )
+    )
+    checkpoint_path = testdir.tmpdir.join("checkpoint.ndjson")
+
+    result = testdir.runpytest_subprocess(
+        "--discord-webhook",
+        discord_webhook_server.make_webhook_url(),
+        "--discord-checkpoint",
+        str(checkpoint_path),
+    )
+
+    assert result.ret == pytest.ExitCode.INTERRUPTED
+    (message,) = discord_webhook_server.messages
+    assert message.payload["content"].startswith("[partial] ")
+    assert "(interrupted)" in message.payload["embeds"][0]["description"]
+    assert not checkpoint_path.exists()
+
+
+@pytest.mark.parametrize(
+    ["options", "expected"],
+    [
+        (["--discord-dedup", "skip"], "pytest-discord: skip a notification identical to *"),
+        (["--discord-dry-run", "dry-run"], "pytest-discord: wrote a payload and 0 attachments *"),
+    ],
+)
+def test_pytest_discord_checkpoint_removed_on_suppression(testdir, options, expected):
+    testdir.makepyfile(PYCODE_PASS)
+    checkpoint_path = testdir.tmpdir.join("checkpoint.ndjson")
+    args = [
+        "--discord-webhook",
+        DUMMY_WEBHOOK_URL,
+        "--discord-checkpoint",
+        str(checkpoint_path),
+        "--discord-dedup-dir",
+        str(testdir.tmpdir.join("dedup")),
+    ]
+
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock):
+        testdir.runpytest(*args, "--discord-dedup", "skip")
+        result = testdir.runpytest(*args, *options)
+
+    result.stdout.fnmatch_lines([expected])
+    assert not checkpoint_path.exists()
+
+
+@pytest.mark.parametrize(
+    ["webhook_url", "expected"],
+    [
+        ("invalid-url", "pytest-discord error: Invalid webhook URL given."),
+        (
+            "http://127.0.0.1:1/api/webhooks/111111111111111111/" + "a" * 68,
+            "pytest-discord error: Cannot connect to host 127.0.0.1:1*",
+        ),
+    ],
+)
+def test_pytest_discord_checkpoint_kept_on_failure(testdir, webhook_url, expected):
+    testdir.makepyfile(PYCODE_PASS)
+    checkpoint_path = testdir.tmpdir.join("checkpoint.ndjson")
+
+    result = testdir.runpytest(
+        "--discord-webhook", webhook_url, "--discord-checkpoint", str(checkpoint_path)
+    )
+
+    result.stdout.fnmatch_lines([expected])
+    assert checkpoint_path.exists()
+
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
+        assert main(["flush", str(checkpoint_path), "--webhook", DUMMY_WEBHOOK_URL]) == 0
+        assert mock_send.call_args[0][0].startswith("[partial] test summary info: 1 tests")
+
+
+def test_pytest_discord_flush(testdir):
+    testdir.makepyfile(
+        dedent(
+            """\
+            import os
+            import time
+
+            def test_pass():
+                assert True
+
+            def test_failed():
+                assert False, "failure reason"
+
+            def test_exit():
+                # let the background writer catch up with the records of the previous tests
+                time.sleep(0.5)
+                os._exit(1)
+            """
+        )
+    )
+    checkpoint_path = testdir.tmpdir.join("checkpoint.ndjson")
+
+    result = testdir.runpytest_subprocess(
+        "--discord-webhook", DUMMY_WEBHOOK_URL, "--discord-checkpoint", str(checkpoint_path)
+    )
+    assert result.ret == 1
+    assert checkpoint_path.exists()
+
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
+        assert main(["flush", str(checkpoint_path), "--webhook", DUMMY_WEBHOOK_URL]) == 0
+
+        assert mock_send.call_args[0][0].startswith("[partial] test summary info: 2 tests")
+        embed = mock_send.call_args[1]["embeds"][0]
+        assert embed.colour == Colour.RED
+        assert "1 passed, 1 failed" in embed.description
+        assert "`test_pytest_discord_flush.py::test_failed`: AssertionError: failure reason" in (
+            embed.description
+        )
+        assert not checkpoint_path.exists()
+
+
+def test_pytest_discord_compress_attachment_reproducible():
+    attachment = Attachment("report.md", b"x" * 2048)
+
+    with mock.patch("time.time", return_value=1000000000.0):
+        first = compress_attachment(attachment, threshold=1024)
+    with mock.patch("time.time", return_value=1000000001.0):
+        second = compress_attachment(attachment, threshold=1024)
+
+    assert first.filename == "report.md.gz"
+    assert first.data == second.data
+    assert gzip.decompress(first.data) == attachment.data
+
+
+def test_pytest_discord_attach_multiple_files(testdir):
+    testdir.makepyfile(
+        dedent(
+            """\
+            def test_pass():
+                assert True
+
+            def test_failed():
+                print("captured output")
+                assert False
+            """
+        )
+    )
+    xml_path = testdir.tmpdir.join("junit.xml")
+
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
+        testdir.runpytest(
+            "--discord-webhook",
+            DUMMY_WEBHOOK_URL,
+            "--discord-attach-file",
+            "--junitxml",
+            str(xml_path),
+            "--discord-attach-junitxml",
+            "--discord-attach-logs",
+        )
+
+        args = mock_send.call_args[1]
+
+        (md_filename, _), (xml_filename, xml_fp), (logs_filename, logs_fp) = args["files"]
+        assert md_filename.endswith(".md")
+        assert xml_filename.endswith(".xml")
+        assert xml_fp.getvalue() == xml_path.read_binary()
+        assert logs_filename.endswith("_logs.zip")
+
+        with zipfile.ZipFile(logs_fp) as archive:
+            (log_name,) = archive.namelist()
+            assert log_name == "001_test_pytest_discord_attach_multiple_files.py_test_failed.log"
+            assert "captured output" in archive.read(log_name).decode("utf8")
+
+
+def test_pytest_discord_attach_junitxml_expanded_path(testdir, monkeypatch):
+    testdir.makepyfile(
+        dedent(
+            """\
+            def test_pass():
+                assert True
+            """
+        )
+    )
+    monkeypatch.setenv("HOME", str(testdir.tmpdir))
+
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
+        testdir.runpytest(
+            "--discord-webhook",
+            DUMMY_WEBHOOK_URL,
+            "--junitxml",
+            "~/junit.xml",
+            "--discord-attach-junitxml",
+        )
+
+        ((xml_filename, xml_fp),) = mock_send.call_args[1]["files"]
+        assert xml_filename.endswith(".xml")
+        assert xml_fp.getvalue() == testdir.tmpdir.join("junit.xml").read_binary()
+
+
+def test_pytest_discord_attach_failed_attachment(testdir):
+    testdir.makepyfile(
+        dedent(
+            """\
+            def test_pass():
+                assert True
+            """
+        )
+    )
+
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
+        with mock.patch(
+            "pytest_discord.plugin.make_junitxml_attachment",
+            side_effect=FileNotFoundError("junit.xml not found"),
+        ):
+            result = testdir.runpytest(
+                "--discord-webhook",
+                DUMMY_WEBHOOK_URL,
+                "--junitxml",
+                "junit.xml",
+                "--discord-attach-file",
+                "--discord-attach-junitxml",
+            )
+
+        result.stdout.fnmatch_lines(["pytest-discord: skip attaching a file: junit.xml not found"])
+        ((md_filename, _),) = mock_send.call_args[1]["files"]
+        assert md_filename.endswith(".md")
+
+
+def test_pytest_discord_duration_regression(testdir):
+    testdir.makepyfile(
+        dedent(
+            """\
+            import os
+            import time
+
+            def test_fast():
+                pass
+
+            def test_slowdown():
+                time.sleep(float(os.environ.get("SLEEP_SEC", "0")))
+            """
+        )
+    )
+
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
+        for _ in range(5):
+            testdir.runpytest(
+                "--discord-webhook", DUMMY_WEBHOOK_URL, "--discord-duration-regression"
+            )
+
+        assert len(mock_send.call_args[1]["embeds"]) == 1
+
+        testdir.monkeypatch.setenv("SLEEP_SEC", "0.3")
+        testdir.runpytest("--discord-webhook", DUMMY_WEBHOOK_URL, "--discord-duration-regression")
+
+        embed = mock_send.call_args[1]["embeds"][1]
+        assert embed.colour == Colour.GOLD
+        assert "1 tests are slower than their baselines" in embed.description
+        assert "`test_pytest_discord_duration_regression.py::test_slowdown`: 0.3" in (
+            embed.description
+        )
+
+
+def test_pytest_discord_duration_baseline_table(tmpdir):
+    path = str(tmpdir.join("baseline.bin"))
+
+    baseline = DurationBaseline()
+    baseline.update({"test_a": 1.0, "test_b": 3.0})
+    baseline.save(path)
+
+    baseline = DurationBaseline.load(path)
+    assert len(baseline) == 2
+    baseline.update({"test_b": 3.0, "test_c": 2.0})
+    baseline.save(path)
+
+    baseline = DurationBaseline.load(path)
+    assert baseline.nodeids == ["test_a", "test_b", "test_c"]
+    assert list(baseline.means) == [1.0, 3.0, 2.0]
+
+    estimate = estimate_duration(path, {"test_b", "test_c", "test_new"})
+    assert estimate.known == 2
+    assert estimate.unknown == 1
+    assert estimate.seconds == pytest.approx(3.0 + 2.0 + 2.0)
+
+    assert estimate_duration(str(tmpdir.join("not_exist.bin")), {"test_a"}) is None
+    tmpdir.join("baseline.bin").write_binary(b"PDDB\x01\x00\x00\x00")
+    assert len(DurationBaseline.load(path)) == 0
+    assert estimate_duration(path, {"test_a"}) is None
+
+
+def test_pytest_discord_resource_usage(testdir):
+    testdir.makepyfile(
+        dedent(
+            """\
+            import time
+
+            def test_busy():
+                start = time.process_time()
+                while time.process_time() - start < 0.2:
+                    pass
+
+            def test_idle():
+                pass
+
+            def test_alloc():
+                global _buffer
+                _buffer = b"x" * (64 * 1024 * 1024)
+            """
+        )
+    )
+
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
+        testdir.runpytest("--discord-webhook", DUMMY_WEBHOOK_URL, "--discord-resource-usage")
+
+        embed = mock_send.call_args[1]["embeds"][1]
+        lines = embed.description.splitlines()
+        assert lines[0] == "**top CPU time**"
+        assert lines[1].startswith("`test_pytest_discord_resource_usage.py::test_busy`: 0.2")
+        assert "**top RSS increase**" in lines
+        assert lines[lines.index("**top RSS increase**") + 1].startswith(
+            "`test_pytest_discord_resource_usage.py::test_alloc`: 6"
+        )
+
+
+def test_pytest_discord_resource_usage_no_tests(testdir):
+    testdir.makepyfile(
+        dedent(
+            """\
+            def test_pass():
+                pass
+            """
+        )
+    )
+
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
+        # no tests run in the process
+        testdir.runpytest(
+            "--discord-webhook", DUMMY_WEBHOOK_URL, "--discord-resource-usage", "-k", "not_exist"
+        )
+
+        assert len(mock_send.call_args[1]["embeds"]) == 1
+
+
+@pytest.mark.parametrize(
+    ["path", "expected"],
+    [
+        ["tests/test_a.py", ("@root",)],
+        ["pkg/tests/test_a.py", ("@any",)],
+        ["docs/api/test_a.py", ("@docs",)],
+        ["pkg/docs/api/test_a.py", ("@qa",)],
+        ["src/test_a.py", ("@qa",)],
+    ],
+)
+def test_pytest_discord_owners_matcher(path, expected):
+    matcher = OwnersMatcher(
+        [
+            ("*", ("@qa",)),
+            ("tests/", ("@any",)),
+            ("/tests/", ("@root",)),
+            ("docs/api/", ("@docs",)),
+        ]
+    )
+
+    assert matcher.match(path) == expected
+
+
+def test_pytest_discord_owners(testdir):
+    for dirname in ["api", "web"]:
+        testdir.mkpydir(dirname).join(f"test_{dirname}.py").write(
+            dedent(
+                """\
+                def test_pass():
+                    pass
+
+                def test_failed():
+                    assert False, "owned failure"
+                """
+            )
+        )
+    testdir.makefile(
+        "",
+        CODEOWNERS=dedent(
+            """\
+            # the last matching pattern takes precedence
+            *       @qa
+            api/    @api-team
+            """
+        ),
+    )
+
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
+        testdir.runpytest(
+            "--discord-webhook",
+            DUMMY_WEBHOOK_URL,
+            "--discord-owners-file",
+            "CODEOWNERS",
+            "--discord-owner-webhook",
+            f"@api-team {DUMMY_WEBHOOK_URL} <@&222222222222222222>",
+            "--discord-owner-webhook",
+            f"@qa {DUMMY_WEBHOOK_URL}",
+        )
+
+        assert mock_send.call_count == 3
+        calls = [(call[0][0], call[1]) for call in mock_send.call_args_list]
+
+        (api_args,) = [
+            args for header, args in calls if header.startswith("<@&222222222222222222> ")
+        ]
+        assert api_args["embeds"][0].colour == Colour.RED
+        assert api_args["embeds"][0].description.splitlines() == [
+            "**1 failed tests owned by @api-team**",
+            "`api/test_api.py::test_failed`: AssertionError: owned failure",
+        ]
+        assert "owned failure" in api_args["embeds"][1].description
+
+        (qa_args,) = [
+            args
+            for _, args in calls
+            if args["embeds"][0].description.startswith("**1 failed tests owned by @qa**")
+        ]
+        assert "`web/test_web.py::test_failed`" in qa_args["embeds"][0].description
+
+
+def test_pytest_discord_fake_server(testdir, discord_webhook_server):
+    testdir.makepyfile(
+        dedent(
+            """\
+            def test_pass():
+                pass
+
+            def test_failed():
+                assert False
+            """
+        )
+    )
+
+    testdir.runpytest(
+        "--discord-webhook",
+        discord_webhook_server.make_webhook_url(),
+        "--discord-attach-file",
+    )
+
+    assert discord_webhook_server.rejected_count == 0
+    (message,) = discord_webhook_server.messages
+    assert message.payload["content"].startswith("test summary info:")
+    assert message.payload["embeds"][0]["color"] == Colour.RED
+    assert [attachment["filename"] for attachment in message.payload["attachments"]] == list(
+        message.files
+    )
+    assert list(message.files)[0].endswith(".md")
+
+
+def test_pytest_discord_fake_server_limits():
+    async def send(url, **kwargs):
+        async with aiohttp.ClientSession() as session:
+            await WebhookClient(url, session=session).send("test", **kwargs)
+
+    with FakeDiscordServer(rate_limit=1, rate_limit_per=0.2) as server:
+        url = server.make_webhook_url()
+
+        asyncio.run(send(url))
+        asyncio.run(send(url))
+        assert len(server.messages) == 2
+        assert server.rate_limited_count == 1
+
+        with pytest.raises(WebhookError) as e:
+            asyncio.run(send(url, embeds=[Embed(description="x" * 4097, colour=Colour.RED)]))
+        assert e.value.status == 400
+        assert "embeds.0.description" in str(e.value)
+        assert len(server.messages) == 2
+
+
+def test_pytest_discord_webhook_url_query(discord_webhook_server):
+    async def send(url):
+        async with aiohttp.ClientSession() as session:
+            client = WebhookClient(url, session=session)
+            await client.send("test")
+            return client.url
+
+    base_url = discord_webhook_server.make_webhook_url()
+
+    assert asyncio.run(send(base_url + "/?thread_id=123")) == base_url + "?thread_id=123"
+    (message,) = discord_webhook_server.messages
+    assert message.thread_id == "123"
+
+    with pytest.raises(ValueError):
+        WebhookClient(base_url + "/extra?thread_id=123", session=None)
+
+
+def test_pytest_discord_fake_server_load_test(discord_webhook_server):
+    result = asyncio.run(run_load_test(discord_webhook_server, sessions=100))
+
+    assert result.sent == 100
+    assert result.failed == 0
+    assert result.throughput > 0
+    assert 0 < result.percentile(50) <= result.percentile(99)
+    assert len(discord_webhook_server.messages) == 100
+
+
+def test_pytest_discord_persistent(testdir, discord_webhook_server):
+    testdir.makepyfile(
+        dedent(
+            """\
+            import os
+
+            def test_flaky():
+                assert not os.environ.get("FAIL")
+            """
+        )
+    )
+    url = discord_webhook_server.make_webhook_url()
+
+    for fail in ["", "", "1", "1", ""]:
+        testdir.monkeypatch.setenv("FAIL", fail)
+        result = testdir.runpytest("--discord-webhook", url, "--discord-persistent")
+
+    assert [
+        message.payload["embeds"][0]["color"] for message in discord_webhook_server.messages
+    ] == [Colour.GREEN, Colour.RED, Colour.GREEN]
+
+    result = testdir.runpytest("--discord-webhook", url, "--discord-persistent")
+    result.stdout.fnmatch_lines(["*pytest-discord: skip a notification: the outcome is the same*"])
+    assert len(discord_webhook_server.messages) == 3
+
+
+def test_pytest_discord_dry_run(testdir):
+    testdir.makepyfile(
+        dedent(
+            """\
+            def test_pass():
+                pass
+
+            def test_failed():
+                assert False
+            """
+        )
+    )
+
+    testdir.monkeypatch.delenv("CI", raising=False)
+
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
+        result = testdir.runpytest(
+            "--discord-dry-run", "dry-run", "--discord-attach-file", "--discord-username", "ci"
+        )
+
+        mock_send.assert_not_called()
+
+    result.stdout.fnmatch_lines(["pytest-discord: wrote a payload and 1 attachments to dry-run *"])
+    out_dir = testdir.tmpdir.join("dry-run")
+    payload = json.loads(out_dir.join("payload.json").read_text("utf8"))
+    (attachment_name,) = [attachment["filename"] for attachment in payload["attachments"]]
+    assert out_dir.join(attachment_name).check(file=True)
+
+    # normalize values depending on environments
+    payload["content"] = re.sub(r"tests: .+$", "tests: <platform>", payload["content"])
+    payload["embeds"][0]["description"] = re.sub(
+        r"in [0-9.]+ seconds", "in <duration> seconds", payload["embeds"][0]["description"]
+    )
+    assert payload == {
+        "content": "test summary info: 2 tests: <platform>",
+        "username": "ci",
+        "embeds": [
+            {
+                "type": "rich",
+                "description": "1 failed, 1 passed in <duration> seconds",
+                "color": Colour.RED,
+            }
+        ],
+        "attachments": [{"id": 0, "filename": attachment_name}],
+    }
+
+
+def test_pytest_discord_dry_run_digest(testdir):
+    testdir.makepyfile(PYCODE_PASS)
+    digest_dir = testdir.tmpdir.join("digest")
+
+    with mock.patch(WEBHOOK_SEND, new_callable=AsyncMock) as mock_send:
+        result = testdir.runpytest(
+            "--discord-webhook",
+            DUMMY_WEBHOOK_URL,
+            "--discord-digest",
+            str(digest_dir),
+            "--discord-digest-window",
+            "0",
+            "--discord-dry-run",
+            "dry-run",
+        )
+
+        mock_send.assert_not_called()
+
+    result.stdout.fnmatch_lines(["pytest-discord: wrote a payload and 0 attachments to dry-run *"])
+    assert testdir.tmpdir.join("dry-run", "payload.json").check(file=True)
+    assert not digest_dir.check()
+
+
+def test_pytest_discord_notify_start(testdir, discord_webhook_server):
+    testdir.makepyfile(
+        dedent(
+            """\
+            import time
+
+            def test_pass():
+                pass
+
+            def test_slow():
+                time.sleep(0.1)
+            """
+        )
+    )
+    url = discord_webhook_server.make_webhook_url()
+
+    testdir.runpytest("--discord-webhook", url, "--discord-notify-start")
+
+    start_message, result_message = discord_webhook_server.messages
+    assert start_message.payload["content"] == (
+        "test session started: 2 tests, no duration baselines to estimate the finish time yet"
+    )
+    assert result_message.payload["content"].startswith("test summary info:")
+
+    discord_webhook_server.clear()
+    testdir.makepyfile(
+        test_new=dedent(
+            """\
+            def test_new():
+                pass
+            """
+        )
+    )
+    testdir.runpytest("--discord-webhook", url, "--discord-notify-start")
+
+    start_message, result_message = discord_webhook_server.messages
+    assert re.fullmatch(
+        r"test session started: 3 tests, estimated [0-9.]+s \(finish at .+\), "
+        r"1 tests without baselines",
+        start_message.payload["content"],
+    )
+    assert "embeds" not in start_message.payload
+    assert len(result_message.payload["embeds"]) == 1
+
+
+def test_pytest_discord_digest_concurrent_append(tmpdir):
+    digest_dir = str(tmpdir.join("digest"))
+    append_ct = 50
+
+    def append_runs(failed_nodeid):
+        # separate stores lock each other like separate processes
+        store = DigestStore(digest_dir)
+        for _ in range(append_ct):
+            store.append({"passed": 1, "failed": 1}, [failed_nodeid])
+
+    threads = [
+        threading.Thread(target=append_runs, args=(f"test_a.py::test_{i}",)) for i in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    digest = DigestStore(digest_dir).make_digest()
+    assert digest.runs == append_ct * 2
+    assert digest.outcomes == {"passed": append_ct * 2, "failed": append_ct * 2}
+    assert digest.failures == {"test_a.py::test_0": append_ct, "test_a.py::test_1": append_ct}